@@ -1,14 +1,44 @@
+"""Dashboard EMR & HOPE (dijalankan dengan ``streamlit run app.py``).
+
+Script ini dieksekusi ulang di setiap rerun, jadi isinya dijaga tipis: komponen
+halaman ada di components.py dan tahap pengolahan di engine.stages, keduanya
+diimpor sekali per proses. Set ``ED_WARMUP=1`` untuk memuat modul berat
+(openpyxl, plotly) di latar saat proses server pertama kali menjalankan script.
+"""
+import streamlit as st
+
 def run_emr_module():
-    import streamlit as st
-    import pandas as pd
-    from io import BytesIO
     from uuid import uuid4
-    import plotly.express as px
-    from datetime import datetime, time as dt_time
+    from datetime import datetime
+    from components import (create_profiler, create_summary, data_overview, get_raw_sheet, job_subscriber, load_data,
+                            paginated_table, parse_time_input, plot_trends, show_parse_times, show_result_cache_stats,
+                            tracked_job)
+    from engine.duplicates import duplicate_index
+    from engine.export import EXPORT_FORMATS, XLSX_MIME, frame_excel_bytes
+    from engine.jobs import get_default_runner
+    from engine.result_cache import fingerprint
+    from engine.session_store import SessionStore
+    from engine.stages import clean_job, download_job, summary_job
+    from engine.streaming import stream_csv_summary
+    from engine.time_index import time_index
+    from engine.rollup import GRANULARITIES, attach_emr_cube
+    from engine.summary import METRICS, percentage_per_day, percentage_total, total_row
     
     # Konfigurasi Halaman
     st.set_page_config(page_title="EMR Adoption Rate Dashboard", layout="wide", initial_sidebar_state="expanded")
     
+    # Instrumentasi per tahap (aktif lewat sidebar atau ED_PROFILE=1)
+    profiler = create_profiler("emr")
+    duplicate_index = profiler.wrap("duplicate_index", duplicate_index)
+    time_index = profiler.wrap("time_index", time_index)
+    stream_csv_summary = profiler.wrap("stream_csv_summary", stream_csv_summary)
+    load_data = profiler.wrap("load_data", load_data)
+    data_overview = profiler.wrap("data_overview", data_overview)
+    create_summary = profiler.wrap("create_summary", create_summary)
+    plot_trends = profiler.wrap("plot_trends", plot_trends)
+    # Parse, pembersihan, summary, dan ekspor berjalan sebagai job latar
+    runner = get_default_runner()
+    
     # Styling CSS untuk Tampilan
     st.markdown(
         """
@@ -28,161 +58,34 @@ def run_emr_module():
     if 'tabs' not in st.session_state:
         st.session_state.tabs = []
     if 'tab_data' not in st.session_state:
-        st.session_state.tab_data = {}
+        # Data per tab: satu basis data mentah per upload, data bersih sebagai posisi baris
+        st.session_state.tab_data = SessionStore()
     if 'show_summary' not in st.session_state:
         st.session_state.show_summary = False
     if 'summary_calculated' not in st.session_state:
         st.session_state.summary_calculated = False
     
-    # Fungsi Pengolahan Data
-    @st.cache_data(show_spinner=False)
-    def load_data(uploaded_file):
-        """Memuat data dari file CSV atau Excel dengan penanganan error."""
-        try:
-            if uploaded_file.name.endswith("csv"):
-                df = pd.read_csv(uploaded_file)
-                return {"sheets": {"Sheet1": df}, "multiple": False}
-            else:
-                xlsx = pd.ExcelFile(uploaded_file)
-                sheets = {sheet_name: pd.read_excel(xlsx, sheet_name=sheet_name) for sheet_name in xlsx.sheet_names}
-                return {"sheets": sheets, "multiple": len(sheets) > 1}
-        except Exception as e:
-            st.error(f"Gagal membaca file: {e}")
-            return None
-    
-    def convert_date_columns(df, columns=["created_date", "admission_date"]):
-        """Mengonversi kolom tanggal ke format datetime dengan error handling."""
-        for col in columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors="coerce")
-        return df
-    
-    def data_overview(df):
-        """Menampilkan ringkasan data."""
-        st.write("**Jumlah Kolom:**", df.shape[1])
-        st.write("**Jumlah Baris:**", df.shape[0])
-        st.write("**Missing Values per Kolom:**")
-        st.write(df.isnull().sum())
-    
-    def detect_duplicates(df):
-        """Mendeteksi duplikat berdasarkan admission_no dan created_date."""
-        dup_epa = df[df.duplicated(subset=["admission_no"], keep=False) & df["admission_no"].notnull()] if "admission_no" in df.columns else pd.DataFrame()
-        dup_created = df[df.duplicated(subset=["created_date"], keep=False)] if "created_date" in df.columns else pd.DataFrame()
-        df_no_epa = df[df["admission_no"].isnull()] if "admission_no" in df.columns else pd.DataFrame()
-        combined = pd.DataFrame()
-        if not dup_epa.empty or not dup_created.empty:
-            cond = pd.Series(False, index=df.index)
-            if "admission_no" in df.columns:
-                cond |= (df.duplicated(subset=["admission_no"], keep=False) & df["admission_no"].notnull())
-            if "created_date" in df.columns:
-                cond |= df.duplicated(subset=["created_date"], keep=False)
-            combined = df[cond].sort_values(by="created_date") if "created_date" in df.columns else df[cond]
-        return dup_epa, dup_created, combined, df_no_epa
-    
-    def detect_dup_admission_diff_created(df):
-        """Mendeteksi admission_no duplikat dengan created_date berbeda."""
-        if "admission_no" not in df.columns or "created_date" not in df.columns:
-            return pd.DataFrame()
-        df_filled = df[df["admission_no"].notnull()]
-        dup_diff = df_filled.groupby("admission_no").filter(lambda g: g["created_date"].nunique() > 1)
-        if "created_date" in dup_diff.columns:
-            dup_diff = dup_diff.sort_values(by="created_date")
-        return dup_diff
-    
-    def clean_duplicates(df, remove_no_epa=False):
-        """Membersihkan duplikat dan menghapus baris tanpa admission_no jika diinginkan."""
-        before = df.shape[0]
-        df_cleaned = df.drop_duplicates(subset=["admission_no", "created_date"], keep="first") if "admission_no" in df.columns and "created_date" in df.columns else df.copy()
-        removed_dup = before - df_cleaned.shape[0]
-        removed_no_epa_count = 0
-        if remove_no_epa and "admission_no" in df_cleaned.columns:
-            removed_no_epa_count = df_cleaned["admission_no"].isnull().sum()
-            df_cleaned = df_cleaned[df_cleaned["admission_no"].notnull()]
-        total_removed = before - df_cleaned.shape[0]
-        msg = (f"<b>Pembersihan Selesai:</b><br>"
-               f"Duplikat dihapus: {removed_dup} baris.<br>"
-               f"Baris tanpa admission dihapus: {removed_no_epa_count} baris.<br>"
-               f"Total baris dihapus: {total_removed}.<br>"
-               f"Sisa data: {df_cleaned.shape[0]} baris.")
-        return df_cleaned, msg
-    
-    def filter_data_by_date(df, start_dt, end_dt, date_col="admission_date"):
-        """Memfilter data berdasarkan rentang tanggal."""
-        if date_col not in df.columns:
-            st.error(f"Kolom {date_col} tidak ditemukan untuk filtering.")
-            return df
-        mask = (df[date_col] >= start_dt) & (df[date_col] <= end_dt)
-        return df.loc[mask]
-    
-    def create_summary(df):
-        """Membuat ringkasan adopsi EMR berdasarkan admission_date."""
-        if "admission_date" not in df.columns:
-            st.error("Kolom admission_date tidak ditemukan.")
-            return pd.DataFrame()
-        summary = df.groupby(df["admission_date"].dt.date).agg(
-            Total_Triage=("admission_date", "count"),
-            Link_EPA=("admission_no", lambda x: x.notnull().sum()),
-            NurseAssessment=("nurse_assessor", lambda x: x.notnull().sum()),
-            InitAssessment=("assigned_doctor_name", lambda x: x.notnull().sum()),
-            HOME=("ed_discharge_plan", lambda x: (x == "HOME").sum()),
-            IPD=("ed_discharge_plan", lambda x: (x == "IPD").sum()),
-            PASSAWAY=("ed_discharge_plan", lambda x: (x == "PASSAWAY").sum()),
-            Reviewed_Medical_Equipment=("reviewed_medical_equipment", lambda x: (x == "Ya").sum()),
-            Discharge_Approved=("status_discharge", lambda x: (x == "APPROVED").sum())
-        )
-        summary.index = pd.to_datetime(summary.index).strftime("%d-%b-%Y")
-        summary = summary.sort_index(key=lambda x: pd.to_datetime(x, format="%d-%b-%Y"))
-        return summary
-    
-    def generate_excel_download(df_cleaned, summary, filename):
-        """Membuat file Excel untuk diunduh."""
-        to_excel = BytesIO()
-        with pd.ExcelWriter(to_excel, engine='openpyxl') as writer:
-            df_cleaned.to_excel(writer, index=False, sheet_name='Cleaned_Data')
-            summary.to_excel(writer, index=True, sheet_name='Summary')
-            # Hitung persentase per hari
-            perc_per_hari = summary.copy()
-            perc_per_hari["EPA_Percentage"] = (perc_per_hari["Link_EPA"] / perc_per_hari["Total_Triage"] * 100).round(1)
-            perc_per_hari["Review_Percentage"] = (perc_per_hari["Reviewed_Medical_Equipment"] / perc_per_hari["Total_Triage"] * 100).round(1)
-            perc_per_hari[["EPA_Percentage", "Review_Percentage"]].to_excel(writer, index=True, sheet_name='Persentase_Per_Hari')
-            # Hitung persentase keseluruhan
-            total = summary.sum(numeric_only=True)
-            total_perc = pd.DataFrame({
-                "EPA_Percentage": [(total["Link_EPA"] / total["Total_Triage"] * 100).round(1)],
-                "Review_Percentage": [(total["Reviewed_Medical_Equipment"] / total["Total_Triage"] * 100).round(1)]
-            }, index=["Total"])
-            total_perc.to_excel(writer, index=True, sheet_name='Persentase_Keseluruhan')
-        return to_excel.getvalue()
-    
-    def plot_trends(summary, selected_metrics):
-        """Membuat grafik tren berdasarkan metrik yang dipilih."""
-        fig = px.line(summary.reset_index(), x="index", y=selected_metrics,
-                      markers=True, title="Tren Metrik per Tanggal")
-        fig.update_layout(hovermode="x unified", template="plotly_white")
-        return fig
-    
-    def parse_time_input(time_str):
-        """Mengonversi input waktu ke format time dengan validasi."""
-        try:
-            return datetime.strptime(time_str.strip(), "%H:%M").time()
-        except ValueError:
-            st.error("Format waktu harus HH:MM (misalnya, 23:59).")
-            return None
-    
     # Sidebar untuk Manajemen Session
     st.sidebar.header("📊 Sessions")
     if st.session_state.tabs:
+        tab_usage = st.session_state.tab_data.usage()
+        st.sidebar.caption(f"Memori data: {sum(tab_usage.values()) / 1e6:.0f} / "
+                           f"{st.session_state.tab_data.budget_bytes / 1e6:.0f} MB")
+        show_result_cache_stats()
         for tab in st.session_state.tabs:
             with st.sidebar.container():
                 cols = st.columns([0.8, 0.2])
                 new_name = cols[0].text_input("", value=tab["name"], key=f"edit_{tab['id']}")
+                state = st.session_state.tab_data.get(tab["id"])
+                if state is not None:
+                    status = "di cache disk" if state.spilled else f"{tab_usage.get(tab['id'], 0) / 1e6:.1f} MB"
+                    cols[0].caption(status)
                 if new_name and new_name not in [t["name"] for t in st.session_state.tabs if t["id"] != tab["id"]]:
                     tab["name"] = new_name
                 if cols[1].button("✕", key=f"delete_{tab['id']}"):
                     st.session_state.tabs = [t for t in st.session_state.tabs if t["id"] != tab["id"]]
-                    if tab["id"] in st.session_state.tab_data:
-                        del st.session_state.tab_data[tab["id"]]
-                    st.experimental_rerun()
+                    st.session_state.tab_data.remove(tab["id"])
+                    st.rerun()
     
     session_names = [tab["name"] for tab in st.session_state.tabs]
     selected_session_name = st.sidebar.radio("Pilih Session", session_names) if session_names else None
@@ -193,8 +96,8 @@ def run_emr_module():
         if new_tab_name and new_tab_name not in session_names:
             new_id = str(uuid4())
             st.session_state.tabs.append({"id": new_id, "name": new_tab_name})
-            st.session_state.tab_data[new_id] = {"raw": None, "cleaned": None, "log": [], "sheets": None, "selected_sheet": None}
-            st.experimental_rerun()
+            st.session_state.tab_data.add(new_id)
+            st.rerun()
     
     # Tampilan Utama
     st.markdown('<div class="welcome">Selamat datang, Rafi!</div>', unsafe_allow_html=True)
@@ -202,84 +105,165 @@ def run_emr_module():
         st.info("Belum ada session. Silakan tambahkan session di sidebar.")
     else:
         st.markdown(f"## Session: {selected_tab['name']}")
+        tab_state = st.session_state.tab_data[selected_tab["id"]]
     
         # 1. Upload File
         st.markdown('<div class="section-header">1. Upload File Data</div>', unsafe_allow_html=True)
         uploaded_file = st.file_uploader("Upload CSV/XLSX", type=["csv", "xlsx"], key=f"file_{selected_tab['id']}")
+        keep_all_columns = st.checkbox("Pertahankan semua kolom", key=f"keep_all_{selected_tab['id']}",
+                                       help="Secara default hanya kolom yang dipakai dashboard yang dibaca.")
+        if uploaded_file and uploaded_file.name.lower().endswith("csv") and st.checkbox(
+                "Mode streaming untuk CSV besar", key=f"stream_{selected_tab['id']}",
+                help="Data dibaca per chunk; hanya summary yang dihitung tanpa memuat seluruh file ke memori."):
+            stream_remove_no_epa = st.checkbox("Hapus baris tanpa admission_no", key=f"stream_no_epa_{selected_tab['id']}")
+            stream_date_format = st.text_input("Format tanggal (opsional, mis. %d/%m/%Y %H:%M)", key=f"stream_fmt_{selected_tab['id']}",
+                                               help="Kosongkan agar format ditebak sekali dari nilai pertama dan dipakai untuk semua chunk.")
+            if st.button("Proses Streaming"):
+                with st.spinner("Memproses CSV per chunk..."):
+                    try:
+                        tab_state.stream = stream_csv_summary(uploaded_file, stream_remove_no_epa,
+                                                              date_format=stream_date_format.strip() or None)
+                    except ValueError as e:
+                        st.error(str(e))
+            stream_result = tab_state.stream
+            if stream_result:
+                summary, msg, stats = stream_result
+                st.markdown(msg, unsafe_allow_html=True)
+                st.caption(f"{stats['rows']} baris dalam {stats['chunks']} chunk; indeks kunci {stats['keyset_bytes'] / 1e6:.1f} MB")
+                st.caption("Format tanggal: " + ", ".join(f"{col} = {fmt or 'campuran'}" for col, fmt in stats["date_formats"].items()))
+                st.markdown("### Summary Per Hari")
+                st.dataframe(summary)
+                st.markdown("### Total Summary")
+                st.dataframe(total_row(summary))
+            st.stop()
         if uploaded_file:
-            file_data = load_data(uploaded_file)
-            if file_data:
-                st.session_state.tab_data[selected_tab["id"]]["sheets"] = file_data["sheets"]
-                st.session_state.tab_data[selected_tab["id"]]["raw"] = None
-                st.session_state.tab_data[selected_tab["id"]]["selected_sheet"] = None
+            file_data = load_data(uploaded_file, keep_all_columns)
+            if file_data and (tab_state.sheets is None or file_data["sheets"].spec != tab_state.sheets.spec):
+                tab_state.set_workbook(file_data["sheets"])
     
-        sheets = st.session_state.tab_data[selected_tab["id"]]["sheets"]
+        sheets = tab_state.sheets
         if sheets:
             if len(sheets) > 1:
+                if st.checkbox("Parse semua sheet secara paralel", key=f"parallel_{selected_tab['id']}"):
+                    with st.spinner("Memuat seluruh sheet..."):
+                        sheets.load_all(parallel=True)
+                    with st.expander("Waktu Parse per Sheet"):
+                        show_parse_times(sheets, sheets.sheet_names)
                 selected_sheet = st.selectbox("Pilih Sheet", options=list(sheets.keys()), key=f"sheet_{selected_tab['id']}")
                 if selected_sheet:
-                    st.session_state.tab_data[selected_tab["id"]]["selected_sheet"] = selected_sheet
-                    df = sheets[selected_sheet].copy()
-                    df = convert_date_columns(df)
+                    df = get_raw_sheet(runner, tab_state, sheets, selected_sheet, profiler)
+                    if df is None:
+                        st.stop()
+                    show_parse_times(sheets, [selected_sheet])
                     if "created_date" in df.columns and "admission_date" in df.columns:
-                        st.session_state.tab_data[selected_tab["id"]]["raw"] = df
+                        tab_state.set_raw(selected_sheet, df)
                         st.dataframe(df.head())
                         with st.expander("Tampilkan Data Overview"):
                             data_overview(df)
                     else:
                         st.error("Kolom 'created_date' atau 'admission_date' tidak ditemukan.")
             else:
-                df = list(sheets.values())[0].copy()
-                df = convert_date_columns(df)
+                df = get_raw_sheet(runner, tab_state, sheets, sheets.sheet_names[0], profiler)
+                if df is None:
+                    st.stop()
+                show_parse_times(sheets, sheets.sheet_names[:1])
                 if "created_date" in df.columns and "admission_date" in df.columns:
-                    st.session_state.tab_data[selected_tab["id"]]["raw"] = df
-                    st.session_state.tab_data[selected_tab["id"]]["selected_sheet"] = list(sheets.keys())[0]
+                    tab_state.set_raw(sheets.sheet_names[0], df)
                     st.dataframe(df.head())
                     with st.expander("Tampilkan Data Overview"):
                         data_overview(df)
                 else:
                     st.error("Kolom 'created_date' atau 'admission_date' tidak ditemukan.")
     
-        df = st.session_state.tab_data[selected_tab["id"]]["raw"]
+        df = tab_state.raw
         if df is None:
             st.stop()
+        # Tab lain yang paling lama tidak dipakai dilepas bila batas memori terlampaui
+        st.session_state.tab_data.enforce(selected_tab["id"])
     
         # 2. Deteksi Duplikat
         st.markdown('<div class="section-header">2. Deteksi Duplikat</div>', unsafe_allow_html=True)
-        dup_epa, dup_created, combined_duplicates, df_no_epa = detect_duplicates(df)
-        st.info(f"Baris tanpa admission_no: {df_no_epa.shape[0]}")
+        # Extract mentah yang ditambahkan (append) ikut dianalisis bersama data mentah
+        dup_index = duplicate_index(tab_state.raw_all)
+        st.info(f"Baris tanpa admission_no: {dup_index.no_epa_count}")
+        # Tabel tetap tampil setelah tombol ditekan agar dapat dipaginasi
+        show_created_key = f"show_dup_created_{selected_tab['id']}"
+        show_adm_diff_key = f"show_dup_adm_diff_{selected_tab['id']}"
         if st.button("Tampilkan Duplikat (Created Date)"):
+            st.session_state[show_created_key] = True
+        if st.session_state.get(show_created_key):
+            dup_created = dup_index.dup_created()
             if not dup_created.empty:
-                st.dataframe(dup_created.sort_values(by="created_date"))
+                paginated_table(dup_created, f"emr_dup_created_{selected_tab['id']}", sort_by="created_date")
             else:
                 st.success("Tidak ada duplikat berdasarkan created_date.")
         if st.button("Tampilkan Duplikat (Admission No dengan created_date berbeda)"):
-            dup_adm_diff = detect_dup_admission_diff_created(df)
+            st.session_state[show_adm_diff_key] = True
+        if st.session_state.get(show_adm_diff_key):
+            dup_adm_diff = dup_index.admission_diff_created()
             if not dup_adm_diff.empty:
-                st.dataframe(dup_adm_diff)
+                paginated_table(dup_adm_diff, f"emr_dup_adm_diff_{selected_tab['id']}")
             else:
                 st.success("Tidak ada duplikat admission_no dengan created_date berbeda.")
     
         # 3. Pembersihan Duplikat
         st.markdown('<div class="section-header">3. Pembersihan Duplikat</div>', unsafe_allow_html=True)
         remove_no_epa = st.checkbox("Hapus baris tanpa admission_no")
+        clean_state_key = f"job_clean_{selected_tab['id']}"
+        confirm_reclean = True
+        if tab_state.appended:
+            st.warning(f"{tab_state.appended} extract sudah ditambahkan ke data bersih; "
+                       "pembersihan ulang dari data mentah akan membuangnya.")
+            confirm_reclean = st.checkbox("Buang extract tambahan dan bersihkan ulang", key=f"reclean_{selected_tab['id']}")
         if st.button("🧹 Bersihkan Duplikat"):
-            df_cleaned, msg = clean_duplicates(df, remove_no_epa)
-            st.session_state.tab_data[selected_tab["id"]]["cleaned"] = df_cleaned
+            if not confirm_reclean:
+                st.error("Centang konfirmasi di atas untuk membersihkan ulang data.")
+            else:
+                job = runner.submit("clean_duplicates", fingerprint(df, remove_no_epa), clean_job, df, remove_no_epa,
+                                    profiler=profiler, label="Pembersihan duplikat",
+                                    subscriber=job_subscriber(clean_state_key))
+                st.session_state[clean_state_key] = job.key
+                st.session_state[f"{clean_state_key}_no_epa"] = remove_no_epa
+        clean_job_done = tracked_job(runner, clean_state_key)
+        if clean_job_done is not None:
+            cleaned_rows, msg = clean_job_done.result
+            # Data bersih disimpan sebagai posisi baris data mentah, terurut menurut admission_date
+            tab_state.set_cleaned(cleaned_rows, st.session_state.get(f"{clean_state_key}_no_epa", False))
             st.markdown(msg, unsafe_allow_html=True)
             st.session_state.show_summary = False
             st.session_state.summary_calculated = False  # Reset summary calculation flag
+        if tab_state.cleaned_rows is not None:
+            with st.expander("➕ Tambah Extract Baru (Append)"):
+                st.caption("Extract harian baru di-dedupe terhadap indeks kunci data yang sudah ada; "
+                           "hanya hari yang terdampak yang ditambahkan ke summary.")
+                append_file = st.file_uploader("Upload extract baru CSV/XLSX", type=["csv", "xlsx"],
+                                               key=f"append_file_{selected_tab['id']}")
+                if append_file and st.button("Tambahkan ke Session", key=f"append_{selected_tab['id']}"):
+                    append_data = load_data(append_file, keep_all_columns)
+                    if append_data:
+                        extract = append_data["sheets"]
+                        try:
+                            msg, stats = profiler.wrap("append_extract", tab_state.append)(extract[extract.sheet_names[0]])
+                            st.markdown(msg, unsafe_allow_html=True)
+                            st.caption(f"{stats['created_seen']} baris memiliki created_date yang sudah ada; "
+                                       f"{stats['days']} hari summary diperbarui.")
+                        except ValueError as e:
+                            st.error(str(e))
+                if tab_state.history is not None:
+                    st.caption(f"{len(tab_state.history.log)} extract ditambahkan; "
+                               f"indeks kunci {tab_state.history.key_bytes / 1e6:.1f} MB")
     
         # 4. Summary Adopsi EMR
         st.markdown('<div class="section-header">4. Summary Adopsi EMR</div>', unsafe_allow_html=True)
-        df_cleaned = st.session_state.tab_data[selected_tab["id"]]["cleaned"]
+        df_cleaned = tab_state.cleaned
         if df_cleaned is not None:
             use_filter = st.checkbox("Aktifkan Filter Tanggal untuk Summary")
-            df_filtered = df_cleaned.copy()
+            summary_window = (None, None)
             if use_filter:
                 if "admission_date" in df_cleaned.columns:
-                    min_date = df_cleaned["admission_date"].min().to_pydatetime()
-                    max_date = df_cleaned["admission_date"].max().to_pydatetime()
+                    admission_index = time_index(df_cleaned, "admission_date")
+                    min_date = admission_index.min().to_pydatetime()
+                    max_date = admission_index.max().to_pydatetime()
                     start_date = st.date_input("Tanggal Mulai Summary", min_date.date(), min_value=min_date.date(), max_value=max_date.date())
                     end_date = st.date_input("Tanggal Selesai Summary", max_date.date(), min_value=min_date.date(), max_value=max_date.date())
                     start_time_str = st.text_input("Waktu Mulai Summary (HH:MM)", min_date.strftime("%H:%M"))
@@ -289,109 +273,159 @@ def run_emr_module():
                     if start_time and end_time:
                         start_dt = datetime.combine(start_date, start_time)
                         end_dt = datetime.combine(end_date, end_time)
-                        df_filtered = filter_data_by_date(df_cleaned, start_dt, end_dt)
+                        summary_window = (start_dt, end_dt)
                         st.markdown("**Summary telah difilter berdasarkan rentang tanggal dan waktu yang dipilih.**")
                 else:
                     st.error("Kolom admission_date tidak ditemukan untuk filtering summary.")
     
+            granularity = st.radio("Tampilan Summary", options=list(GRANULARITIES), index=2,
+                                   format_func=GRANULARITIES.get, horizontal=True)
+            summary_state_key = f"job_summary_{selected_tab['id']}"
             if st.button("Hitung Summary"):
-                summary = create_summary(df_filtered)
-                if not summary.empty:
+                job = runner.submit("create_summary", fingerprint(df_cleaned), summary_job, df_cleaned,
+                                    profiler=profiler, label="Perhitungan summary",
+                                    subscriber=job_subscriber(summary_state_key))
+                st.session_state[summary_state_key] = job.key
+                st.session_state[f"{summary_state_key}_window"] = summary_window
+            summary_job_done = tracked_job(runner, summary_state_key)
+            if summary_job_done is not None and summary_job_done.result is not None:
+                # Kubus dari job (bisa dari cache bersama) disimpan per tab untuk data bersih yang sama
+                st.session_state[f"{summary_state_key}_cube"] = (summary_job_done.key[1], summary_job_done.result)
+            cube_key, cube = st.session_state.get(f"{summary_state_key}_cube", (None, None))
+            if cube is not None and cube_key == fingerprint(df_cleaned):
+                # Kubus dipasang ke DataFrame tab ini sehingga summary dan grafik tidak membangunnya ulang
+                cube = attach_emr_cube(df_cleaned, cube)
+                window = st.session_state[f"{summary_state_key}_window"]
+                if summary_job_done is not None and not cube.view("day", *window).empty:
                     st.session_state.summary_calculated = True
-                    st.session_state.summary_data = summary  # Simpan summary di session state
+                    st.session_state.summary_window = window
     
             if st.session_state.summary_calculated:
-                summary = st.session_state.summary_data
-                st.markdown("### Summary Per Hari")
+                # Ganti tampilan cukup mengagregasi ulang kubus, tanpa memindai ulang data
+                summary = create_summary(df_cleaned, granularity, *st.session_state.summary_window)
+                st.session_state.summary_data = summary  # Simpan summary di session state
+                st.markdown(f"### Summary {GRANULARITIES[granularity]}")
                 st.dataframe(summary)
-                total = summary.sum(numeric_only=True)
-                total_df = total.to_frame().T
-                total_df.index = ["Total"]
                 st.markdown("### Total Summary")
-                st.dataframe(total_df)
+                st.dataframe(total_row(summary))
     
                 perc_mode = st.radio("Pilih Tampilan Persentase Total", options=["Per Hari", "Keseluruhan"], index=0)
                 if perc_mode == "Per Hari":
-                    perc_table = summary.copy()
-                    perc_table["EPA_Percentage"] = (perc_table["Link_EPA"] / perc_table["Total_Triage"] * 100).round(1)
-                    perc_table["Review_Percentage"] = (perc_table["Reviewed_Medical_Equipment"] / perc_table["Total_Triage"] * 100).round(1)
-                    st.markdown("### Tabel Persentase (Per Hari)")
-                    st.dataframe(perc_table[["EPA_Percentage", "Review_Percentage"]])
+                    st.markdown(f"### Tabel Persentase ({GRANULARITIES[granularity]})")
+                    st.dataframe(percentage_per_day(summary))
                 else:
-                    total_perc = pd.DataFrame({
-                        "EPA_Percentage": [(total["Link_EPA"] / total["Total_Triage"] * 100).round(1)],
-                        "Review_Percentage": [(total["Reviewed_Medical_Equipment"] / total["Total_Triage"] * 100).round(1)]
-                    }, index=["Total"])
                     st.markdown("### Tabel Persentase (Keseluruhan)")
-                    st.dataframe(total_perc)
+                    st.dataframe(percentage_total(summary))
     
-                metrics = ["Total_Triage", "Link_EPA", "Reviewed_Medical_Equipment", "NurseAssessment", "InitAssessment", "HOME", "IPD", "PASSAWAY", "Discharge_Approved"]
-                selected_metrics = st.multiselect("Pilih Metrik untuk Grafik", metrics, default=["Total_Triage", "Discharge_Approved"])
+                selected_metrics = st.multiselect("Pilih Metrik untuk Grafik", METRICS, default=["Total_Triage", "Discharge_Approved"])
                 if selected_metrics:
-                    st.plotly_chart(plot_trends(summary, selected_metrics), use_container_width=True)
+                    fig, shown = plot_trends(df_cleaned, granularity, st.session_state.summary_window, selected_metrics)
+                    if shown != granularity:
+                        st.caption(f"Titik {GRANULARITIES[granularity].lower()} terlalu banyak untuk grafik; "
+                                   f"grafik ditampilkan {GRANULARITIES[shown].lower()}.")
+                    st.plotly_chart(fig, use_container_width=True)
     
         # 5. Download Hasil
         st.markdown('<div class="section-header">5. Download Hasil</div>', unsafe_allow_html=True)
+        cleaned_format = st.radio("Format Cleaned_Data", options=list(EXPORT_FORMATS), horizontal=True,
+                                  format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+                                  help="CSV.gz dan Parquet jauh lebih cepat untuk data besar; summary tetap diunduh sebagai Excel.")
+        download_state_key = f"job_download_{selected_tab['id']}"
         if st.button("Download Hasil Utama"):
             if df_cleaned is not None:
-                summary = create_summary(df_cleaned)
-                filename = f"EMR_Adoption_{selected_tab['name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                excel_data = generate_excel_download(df_cleaned, summary, filename)
-                st.download_button("Unduh File Excel Utama", excel_data, filename, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                # Summary per hari diagregasi dari kubus rollup yang sudah dihitung, tanpa memindai ulang data
+                stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f"EMR_Adoption_{selected_tab['name']}_{stamp}.xlsx"
+                job = runner.submit("generate_excel_download", fingerprint(df_cleaned, cleaned_format), download_job,
+                                    df_cleaned, cleaned_format, profiler=profiler, label="Pembuatan file unduhan",
+                                    subscriber=job_subscriber(download_state_key))
+                st.session_state[download_state_key] = job.key
+                st.session_state[f"{download_state_key}_names"] = (filename, cleaned_format, stamp)
+        download_job_done = tracked_job(runner, download_state_key)
+        if download_job_done is not None:
+            excel_data, cleaned_data = download_job_done.result
+            filename, result_format, stamp = st.session_state[f"{download_state_key}_names"]
+            st.download_button("Unduh File Excel Utama", excel_data, filename, XLSX_MIME)
+            if cleaned_data is not None:
+                label, mime, ext = EXPORT_FORMATS[result_format]
+                st.download_button(f"Unduh Cleaned_Data ({label})", cleaned_data,
+                                   f"EMR_Cleaned_{selected_tab['name']}_{stamp}{ext}", mime)
     
         # Download Duplikat berdasarkan created_date
         if st.button("Download Duplikat (Created Date)"):
-            dup_created = detect_duplicates(df)[1]  # Ambil duplikat created_date
+            dup_created = dup_index.dup_created()  # Ambil duplikat created_date
             if not dup_created.empty:
-                to_excel = BytesIO()
-                dup_created.to_excel(to_excel, index=False)
-                st.download_button("Unduh Duplikat Created Date", to_excel.getvalue(), "duplikat_created_date.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                st.download_button("Unduh Duplikat Created Date", frame_excel_bytes(dup_created), "duplikat_created_date.xlsx", XLSX_MIME)
             else:
                 st.info("Tidak ada duplikat berdasarkan created_date.")
     
         # Download Duplikat admission_no dengan created_date berbeda
         if st.button("Download Duplikat (Admission No)"):
-            dup_adm_diff = detect_dup_admission_diff_created(df)
+            dup_adm_diff = dup_index.admission_diff_created()
             if not dup_adm_diff.empty:
-                to_excel = BytesIO()
-                dup_adm_diff.to_excel(to_excel, index=False)
-                st.download_button("Unduh Duplikat Admission No", to_excel.getvalue(), "duplikat_admission_no.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                st.download_button("Unduh Duplikat Admission No", frame_excel_bytes(dup_adm_diff), "duplikat_admission_no.xlsx", XLSX_MIME)
             else:
                 st.info("Tidak ada duplikat admission_no dengan created_date berbeda.")
     
         # Download Preview Data
         if st.button("Download Preview Data"):
             preview_data = df.head(100)  # Ambil 100 baris pertama
-            to_excel = BytesIO()
-            preview_data.to_excel(to_excel, index=False)
-            st.download_button("Unduh Preview Data", to_excel.getvalue(), "preview_data.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            st.download_button("Unduh Preview Data", frame_excel_bytes(preview_data), "preview_data.xlsx", XLSX_MIME)
 
 def run_hope_module():
-    import streamlit as st
     import pandas as pd
-    from io import BytesIO
+    from components import create_profiler, paginated_table, show_result_cache_stats, upload_key
+    from engine.columns import HOPE_COLUMNS, HOPE_DATE_COLUMNS, HOPE_UNITS
+    from engine.duplicates import hope_duplicate_index
+    from engine.dtypes import optimize_dtypes, report_text
+    from engine.near_duplicates import DEFAULT_MAX_BLOCK, DEFAULT_THRESHOLD, hope_near_duplicates
+    from engine.export import XLSX_MIME, hope_excel_bytes
+    from engine.ingest import load_first_sheet
+    from engine.result_cache import fingerprint, get_result_cache
+    from engine.rollup import hope_adoption_table, hope_cube
+    from engine.stages import hope_columns, remove_cancelled
+    from engine.time_index import time_index
     
     # Konfigurasi Halaman
     st.set_page_config(page_title="HOPE Data Dashboard", layout="wide")
     st.title("📊 HOPE Data Dashboard")
     
+    # Instrumentasi per tahap (aktif lewat sidebar atau ED_PROFILE=1)
+    profiler = create_profiler("hope")
+    load_first_sheet = profiler.wrap("load_first_sheet", load_first_sheet)
+    optimize_dtypes = profiler.wrap("optimize_dtypes", optimize_dtypes)
+    hope_duplicate_index = profiler.wrap("hope_duplicate_index", hope_duplicate_index)
+    hope_near_duplicates = profiler.wrap("hope_near_duplicates", hope_near_duplicates)
+    time_index = profiler.wrap("time_index", time_index)
+    hope_cube = profiler.wrap("hope_cube", hope_cube)
+    hope_adoption_table = profiler.wrap("hope_adoption_table", hope_adoption_table)
+    hope_excel_bytes = profiler.wrap("hope_excel_bytes", hope_excel_bytes)
+    
+    # Hasil tiap tahap dipakai bersama session lain yang mengolah file dan parameter yang sama
+    result_cache = get_result_cache()
+    show_result_cache_stats()
+    
     # Tombol Reset Sesi: Menghapus session state agar proses dapat dimulai ulang
     if st.button("Reset Sesi"):
         st.session_state.clear()
-        st.experimental_rerun()
+        st.rerun()
     
     # ------------------------------ #
     # Section 1: Pilih Unit & Upload #
     # ------------------------------ #
     st.header("1️⃣ Pilih Unit & Upload Data HOPE")
-    unit_options = ["SHDP", "SHSB", "SHLV", "SHKJ", "SHKD", "SHYG", "MRCCC"]
-    selected_unit = st.selectbox("Pilih Unit", options=unit_options)
+    selected_unit = st.selectbox("Pilih Unit", options=HOPE_UNITS)
     
     file = st.file_uploader("Unggah file HOPE (.xlsx)", type=["xlsx"], accept_multiple_files=False)
+    keep_all_columns = st.checkbox("Pertahankan semua kolom", help="Secara default hanya 4 kolom penting yang dibaca.")
     if file:
         try:
-            df = pd.read_excel(file)
+            columns = None if keep_all_columns else HOPE_COLUMNS
+            load_key = upload_key(file, columns)
+            df, dtype_report = result_cache.get_or_compute("hope_load", load_key, lambda: optimize_dtypes(
+                load_first_sheet(file, columns=columns, date_columns=HOPE_DATE_COLUMNS)))
             st.success("File berhasil diunggah!")
+            st.caption(report_text(dtype_report))
         except Exception as e:
             st.error(f"Terjadi error saat membaca file: {e}")
             st.stop()
@@ -404,8 +438,7 @@ def run_hope_module():
         # Section 2: Bersihkan Kolom     #
         # ------------------------------ #
         st.header("2️⃣ Bersihkan Kolom")
-        important_cols = ["Reg. / Adm. Date", "Reg. / Adm. No", "Name", "Status"]
-        missing_cols = [col for col in important_cols if col not in df.columns]
+        missing_cols = [col for col in HOPE_COLUMNS if col not in df.columns]
         
         if missing_cols:
             st.error(f"Kolom berikut tidak ditemukan dalam data: {', '.join(missing_cols)}")
@@ -416,8 +449,10 @@ def run_hope_module():
             st.session_state.cleaned_data = None
     
         if st.button("Bersihkan Kolom"):
-            df_cleaned = df[important_cols].copy()
-            st.session_state.cleaned_data = df_cleaned
+            with profiler.stage("bersihkan_kolom", df) as stage:
+                stage["out"] = result_cache.get_or_compute("hope_columns", load_key, lambda: hope_columns(df))
+            st.session_state.cleaned_data = stage["out"]
+            st.session_state.cleaned_key = load_key
             st.success("Kolom telah dibersihkan! Hanya menyisakan 4 kolom penting.")
     
         # Lanjutkan hanya jika data kolom sudah dibersihkan
@@ -426,17 +461,15 @@ def run_hope_module():
             # Section 3: Cek Duplikat        #
             # ------------------------------ #
             st.header("3️⃣ Cek Duplikat")
-            df_cleaned = st.session_state.cleaned_data.copy()
-            # Konversi kolom tanggal
-            df_cleaned["Reg. / Adm. Date"] = pd.to_datetime(df_cleaned["Reg. / Adm. Date"], errors="coerce")
+            df_cleaned = st.session_state.cleaned_data
             
-            # Duplikat berdasarkan Admission No
-            dup_adm = df_cleaned[df_cleaned.duplicated(subset=["Reg. / Adm. No"], keep=False)]
-            # Duplikat berdasarkan Name
-            dup_name = df_cleaned[df_cleaned.duplicated(subset=["Name"], keep=False)]
-            # Duplikat: pasien dengan nama yang sama pada hari yang sama
-            df_cleaned["Date"] = df_cleaned["Reg. / Adm. Date"].dt.date
-            dup_same_day = df_cleaned.groupby(["Date", "Name"]).filter(lambda g: len(g) > 1)
+            # Analisis duplikat di-memo; hanya dihitung ulang bila data bersih berubah
+            dup_index = hope_duplicate_index(df_cleaned)
+            with profiler.stage("tabel_duplikat", df_cleaned):
+                dup_adm = dup_index.dup_admission()
+                dup_name = dup_index.dup_name()
+                # Duplikat: pasien dengan nama yang sama pada hari yang sama
+                dup_same_day = dup_index.dup_same_day()
             
             st.write(f"Jumlah baris dengan duplikat Reg. / Adm. No: {dup_adm.shape[0]}")
             st.write(f"Jumlah baris dengan duplikat Name: {dup_name.shape[0]}")
@@ -445,21 +478,42 @@ def run_hope_module():
             with st.expander("Tampilkan Detail Duplikat"):
                 if not dup_adm.empty:
                     st.subheader("Duplikat Reg. / Adm. No")
-                    st.dataframe(dup_adm)
+                    paginated_table(dup_adm, "hope_dup_adm")
                 else:
                     st.write("Tidak ada duplikat Reg. / Adm. No.")
                 
                 if not dup_name.empty:
                     st.subheader("Duplikat Name")
-                    st.dataframe(dup_name)
+                    paginated_table(dup_name, "hope_dup_name")
                 else:
                     st.write("Tidak ada duplikat Name.")
                 
                 if not dup_same_day.empty:
                     st.subheader("Duplikat Name pada Hari yang Sama")
-                    st.dataframe(dup_same_day)
+                    paginated_table(dup_same_day, "hope_dup_same_day")
                 else:
                     st.write("Tidak ada pasien dengan nama yang sama pada hari yang sama.")
+            
+            # Nama hampir sama (typo, gelar, spasi): dibandingkan hanya dalam blok (hari, kode fonetik token)
+            if st.checkbox("Cari nama hampir sama pada hari yang sama (fuzzy)"):
+                fuzzy_cols = st.columns(2)
+                threshold = fuzzy_cols[0].slider("Ambang kemiripan nama", 0.5, 1.0, DEFAULT_THRESHOLD, 0.01,
+                                                 help="Koefisien Dice bigram huruf setelah normalisasi nama.")
+                max_block = int(fuzzy_cols[1].number_input("Ukuran blok maksimum", min_value=10, value=DEFAULT_MAX_BLOCK, step=10,
+                                                           help="Blok (hari, kode fonetik) yang lebih besar dilewati agar jumlah pasangan tetap terkendali."))
+                near_dup = hope_near_duplicates(df_cleaned, max_block)
+                near_pairs = near_dup.pairs(threshold)
+                skipped = near_dup.skipped_blocks
+                st.write(f"Pasangan nama hampir sama (kemiripan ≥ {threshold:.2f}): {len(near_pairs)} "
+                         f"dari {near_dup.candidate_pairs} pasangan kandidat di {len(near_dup.blocks)} blok "
+                         f"({len(skipped)} blok dilewati).")
+                with st.expander("Tampilkan Pasangan Nama Hampir Sama"):
+                    if not near_pairs.empty:
+                        paginated_table(near_pairs, "hope_near_pairs")
+                    else:
+                        st.write("Tidak ada pasangan nama hampir sama pada ambang ini.")
+                with st.expander("Pasangan Kandidat per Blok"):
+                    paginated_table(near_dup.blocks, "hope_near_blocks", sort_by="Pasangan_Kandidat", ascending=False)
     
             # ------------------------------ #
             # Section 4: Hapus Data dengan Status 'Cancelled'
@@ -469,7 +523,10 @@ def run_hope_module():
             if "final_df" not in st.session_state:
                 if st.button("Hapus Baris dengan Status 'Cancelled'"):
                     initial_rows = df_cleaned.shape[0]
-                    df_no_cancelled = df_cleaned[df_cleaned["Status"].str.lower() != "cancelled"].copy()
+                    with profiler.stage("hapus_cancelled", df_cleaned) as stage:
+                        df_no_cancelled = result_cache.get_or_compute(
+                            "hope_no_cancelled", st.session_state.cleaned_key, lambda: remove_cancelled(df_cleaned, profiler))
+                        stage["out"] = df_no_cancelled
                     removed_rows = initial_rows - df_no_cancelled.shape[0]
                     st.success(f"Baris dengan status 'Cancelled' dihapus. Total dihapus: {removed_rows}.")
                     st.session_state.final_df = df_no_cancelled
@@ -480,9 +537,9 @@ def run_hope_module():
             
             # Tetapkan final_df untuk proses selanjutnya
             if "final_df" in st.session_state:
-                final_df = st.session_state.final_df.copy()
+                final_df = st.session_state.final_df
             else:
-                final_df = df_cleaned.copy()
+                final_df = df_cleaned
             
             # Pastikan data tidak mengandung baris 'Cancelled'
             if final_df["Status"].str.lower().eq("cancelled").any():
@@ -493,7 +550,7 @@ def run_hope_module():
             # Section 5: Preview Data Bersih #
             # ------------------------------ #
             st.header("5️⃣ Preview Data Bersih")
-            st.dataframe(final_df)
+            paginated_table(final_df, "hope_final")
             st.write(f"Total baris data: {final_df.shape[0]}")
     
             # ------------------------------ #
@@ -501,13 +558,16 @@ def run_hope_module():
             # ------------------------------ #
             st.header("6️⃣ Filter Data Berdasarkan Tanggal")
             try:
-                final_df["Reg. / Adm. Date"] = pd.to_datetime(final_df["Reg. / Adm. Date"], errors="coerce")
+                if not pd.api.types.is_datetime64_any_dtype(final_df["Reg. / Adm. Date"]):
+                    final_df = final_df.assign(**{"Reg. / Adm. Date": pd.to_datetime(final_df["Reg. / Adm. Date"], errors="coerce")})
             except Exception as e:
                 st.error(f"Error saat konversi tanggal: {e}")
             
-            if final_df["Reg. / Adm. Date"].notnull().any():
-                min_date = final_df["Reg. / Adm. Date"].min().date()
-                max_date = final_df["Reg. / Adm. Date"].max().date()
+            date_index = time_index(final_df, "Reg. / Adm. Date")
+            adoption_window = (None, None)
+            if date_index.n_valid:
+                min_date = date_index.min().date()
+                max_date = date_index.max().date()
                 st.write(f"Range tanggal dalam data: {min_date} s/d {max_date}")
                 if st.checkbox("Aktifkan Filter Tanggal"):
                     start_date = st.date_input("Tanggal Mulai", min_value=min_date, max_value=max_date, value=min_date)
@@ -515,17 +575,14 @@ def run_hope_module():
                     
                     if start_date > end_date:
                         st.error("Tanggal mulai harus sebelum tanggal selesai.")
-                        filtered_df = final_df
                     else:
-                        filtered_df = final_df[(final_df["Reg. / Adm. Date"].dt.date >= start_date) & 
-                                                 (final_df["Reg. / Adm. Date"].dt.date <= end_date)]
+                        filtered_df = date_index.slice_dates(start_date, end_date)
+                        adoption_window = (start_date, end_date)
                         st.success(f"Data berhasil difilter. Sisa baris: {filtered_df.shape[0]}")
                 else:
-                    filtered_df = final_df
                     st.info("Filter tanggal tidak diaktifkan.")
             else:
                 st.error("Data tanggal tidak tersedia untuk filtering.")
-                filtered_df = final_df
             
             # Tombol untuk lanjut ke Section 7
             if "proceed_section7" not in st.session_state:
@@ -539,25 +596,15 @@ def run_hope_module():
             # ------------------------------ #
             if st.session_state.get("proceed_section7", False):
                 st.header("7️⃣ Tabel Adopsi Pasien per Hari")
-                # Pastikan kolom tanggal sudah ada
-                filtered_df["Date"] = filtered_df["Reg. / Adm. Date"].dt.date
-                adoption_table = filtered_df.groupby("Date").size().reset_index(name="Jumlah Pasien")
-                # Format tanggal menjadi dd-Mmm (contoh: 12-Feb, 15-Jan)
-                adoption_table["Date"] = pd.to_datetime(adoption_table["Date"]).dt.strftime('%d-%b')
+                # Diambil dari kubus rollup per jam; tanggal berformat dd-Mmm (contoh: 12-Feb, 15-Jan)
+                adoption_key = fingerprint(st.session_state.cleaned_key, "final_df" in st.session_state, adoption_window)
+                adoption_table = result_cache.get_or_compute(
+                    "hope_adoption", adoption_key, lambda: hope_adoption_table(hope_cube(final_df), *adoption_window))
                 
                 if st.button("Tampilkan Adopsi"):
                     st.dataframe(adoption_table)
                     
-                    # Fungsi untuk mengonversi DataFrame ke Excel menggunakan openpyxl
-                    def convert_df_to_excel(dataframe):
-                        output = BytesIO()
-                        writer = pd.ExcelWriter(output, engine='openpyxl')
-                        dataframe.to_excel(writer, index=False, sheet_name='Adopsi')
-                        writer.save()
-                        processed_data = output.getvalue()
-                        return processed_data
-                    
-                    excel_data = convert_df_to_excel(adoption_table)
+                    excel_data = hope_excel_bytes(adoption_table)
                     # Penamaan file berdasarkan range tanggal, tipe data (HOPE), dan unit
                     if 'start_date' in locals() and 'end_date' in locals():
                         filename = f"HOPE_{selected_unit}_{start_date}_{end_date}.xlsx"
@@ -567,14 +614,105 @@ def run_hope_module():
                     st.download_button("Download Tabel Adopsi (Excel)",
                                        data=excel_data,
                                        file_name=filename,
-                                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                                       mime=XLSX_MIME)
                 else:
                     st.info("Tekan tombol 'Tampilkan Adopsi' untuk melihat tabel adopsi pasien per hari.")
 
+def run_reconcile_module():
+    import pandas as pd
+    from components import create_profiler, job_subscriber, paginated_table, show_result_cache_stats, tracked_job
+    from engine.export import XLSX_MIME, excel_bytes
+    from engine.jobs import get_default_runner
+    from engine.pipeline import detect_unit
+    from engine.reconcile import daily_by_unit
+    from engine.result_cache import fingerprint, get_result_cache
+    from engine.stages import reconcile_job
+
+    st.set_page_config(page_title="Rekonsiliasi EMR ↔ HOPE", layout="wide")
+    st.title("🔗 Rekonsiliasi EMR ↔ HOPE")
+    st.caption("Mencocokkan registrasi HOPE dengan catatan triage EMR berdasarkan nomor admisi yang dinormalkan.")
+
+    profiler = create_profiler("reconcile")
+    excel_bytes = profiler.wrap("excel_bytes", excel_bytes)
+    runner = get_default_runner()
+    result_cache = get_result_cache()
+    show_result_cache_stats()
+
+    # ------------------------------ #
+    # Section 1: Upload per Unit     #
+    # ------------------------------ #
+    st.header("1️⃣ Upload Extract EMR & HOPE")
+    st.caption("Unit ditebak dari nama file (mis. SHDP_januari.xlsx); unggah satu file EMR dan satu file HOPE per unit.")
+    emr_files = st.file_uploader("Extract EMR (CSV/XLSX)", type=["csv", "xlsx"], accept_multiple_files=True,
+                                 key="reconcile_emr")
+    hope_files = st.file_uploader("Extract HOPE (.xlsx)", type=["xlsx"], accept_multiple_files=True,
+                                  key="reconcile_hope")
+    emr_by_unit = {detect_unit(f.name): f for f in emr_files or []}
+    hope_by_unit = {detect_unit(f.name): f for f in hope_files or []}
+    units = sorted(set(emr_by_unit) | set(hope_by_unit))
+    if not units:
+        st.info("Unggah extract EMR dan HOPE untuk memulai rekonsiliasi.")
+        return
+    st.dataframe(pd.DataFrame({
+        "EMR": [emr_by_unit[u].name if u in emr_by_unit else "-" for u in units],
+        "HOPE": [hope_by_unit[u].name if u in hope_by_unit else "-" for u in units],
+    }, index=pd.Index(units, name="Unit")))
+    paired = [u for u in units if u in emr_by_unit and u in hope_by_unit]
+    if len(paired) < len(units):
+        st.warning(f"Unit tanpa pasangan file dilewati: {', '.join(u for u in units if u not in paired)}")
+
+    # ------------------------------ #
+    # Section 2: Rekonsiliasi        #
+    # ------------------------------ #
+    st.header("2️⃣ Jalankan Rekonsiliasi")
+    if paired and st.button("Jalankan Rekonsiliasi"):
+        sources = {u: ((emr_by_unit[u].getvalue(), emr_by_unit[u].name),
+                       (hope_by_unit[u].getvalue(), hope_by_unit[u].name)) for u in paired}
+        key = fingerprint(*[part for u in paired for part in (u, sources[u][0][0], sources[u][1][0])])
+        job = runner.submit("reconcile", key, reconcile_job, sources, label="Rekonsiliasi",
+                            subscriber=job_subscriber("job_reconcile"))
+        st.session_state.job_reconcile = job.key
+    job_done = tracked_job(runner, "job_reconcile")
+    if job_done is not None:
+        st.session_state.reconcile_result = (job_done.key[1], *job_done.result)
+    if "reconcile_result" not in st.session_state:
+        return
+    result_key, unit_table, results = st.session_state.reconcile_result
+
+    # ------------------------------ #
+    # Section 3: Hasil               #
+    # ------------------------------ #
+    st.header("3️⃣ Persentase Kecocokan per Unit")
+    st.dataframe(unit_table)
+    daily = daily_by_unit(results)
+    st.subheader("Per Hari")
+    paginated_table(daily, "reconcile_daily")
+    summary_data = result_cache.get_or_compute("reconcile_excel", result_key, lambda: excel_bytes(
+        [("Per_Unit", unit_table, True), ("Per_Hari", daily, False)]))
+    st.download_button("Download Rekonsiliasi (Excel)", summary_data, "Rekonsiliasi_EMR_HOPE.xlsx", XLSX_MIME)
+
+    st.header("4️⃣ Baris yang Tidak Cocok")
+    unit = st.selectbox("Pilih Unit", list(results), key="reconcile_unit")
+    result = results[unit]
+    st.subheader(f"Registrasi HOPE tanpa EMR ({len(result['unmatched_hope'])})")
+    paginated_table(result["unmatched_hope"], f"reconcile_hope_{unit}")
+    st.subheader(f"admission_no EMR tanpa registrasi HOPE ({len(result['unmatched_emr'])})")
+    paginated_table(result["unmatched_emr"], f"reconcile_emr_{unit}")
+    if st.button("Siapkan Unduhan Baris Tidak Cocok"):
+        unmatched_data = result_cache.get_or_compute("reconcile_unmatched", fingerprint(result_key, unit), lambda: excel_bytes(
+            [("Unmatched_HOPE", result["unmatched_hope"], False), ("Unmatched_EMR", result["unmatched_emr"], False)]))
+        st.download_button("Download Baris Tidak Cocok (Excel)", unmatched_data, f"Unmatched_{unit}.xlsx", XLSX_MIME)
+
 if __name__ == "__main__":
+    from engine.warmup import start_warm_up, warmup_enabled
+
+    if warmup_enabled():
+        start_warm_up()
     st.set_page_config(page_title="EMR & HOPE Dashboard", layout="wide")
-    mode = st.sidebar.radio("Pilih tipe data:", ["EMR", "HOPE"])
+    mode = st.sidebar.radio("Pilih tipe data:", ["EMR", "HOPE", "Rekonsiliasi"])
     if mode == "EMR":
         run_emr_module()
-    else:
+    elif mode == "HOPE":
         run_hope_module()
+    else:
+        run_reconcile_module()
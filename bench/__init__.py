@@ -0,0 +1 @@
+"""Benchmark pipeline EMR & HOPE dengan data sintetis."""
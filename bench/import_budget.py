@@ -0,0 +1,80 @@
+"""Anggaran waktu impor cold start dashboard, diukur dengan ``python -X importtime``.
+
+Contoh::
+
+    python -m bench.import_budget
+    python -m bench.import_budget --budget-ms 1200 --top 15
+
+Modul dashboard diimpor di proses Python baru; total waktu impor kumulatif
+dibandingkan dengan anggaran, dan modul yang seharusnya baru dimuat saat
+dibutuhkan (openpyxl, plotly.express) tidak boleh ikut terimpor. Keluar
+dengan kode 1 bila salah satu dilanggar.
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+DEFAULT_MODULES = "components,engine.stages"
+DEFAULT_BUDGET_MS = 1500
+# Dimuat lewat impor di dalam fungsi (engine.export, engine.ingest); plotly.graph_objects
+# tidak termasuk karena sudah diimpor oleh Streamlit sendiri
+LAZY_MODULES = ["openpyxl", "plotly.express"]
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(text):
+    """Baris ``-X importtime`` menjadi daftar ``(modul, kedalaman, self_us, kumulatif_us)``."""
+    entries = []
+    for line in text.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure_imports(modules):
+    """Mengimpor ``modules`` di interpreter baru dan mengembalikan entri importtime-nya."""
+    code = "; ".join(f"import {name}" for name in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "impor gagal")
+    return parse_importtime(proc.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cek anggaran waktu impor cold start dashboard.")
+    parser.add_argument("--modules", default=DEFAULT_MODULES, help=f"Modul yang diimpor, dipisah koma (default: {DEFAULT_MODULES})")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help=f"Anggaran total impor dalam ms (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--lazy", default=",".join(LAZY_MODULES), help="Modul yang tidak boleh terimpor saat cold start, dipisah koma")
+    parser.add_argument("--top", type=int, default=10, help="Jumlah impor teratas yang ditampilkan (default: 10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    entries = measure_imports([m.strip() for m in args.modules.split(",") if m.strip()])
+    total_ms = sum(cumulative for _, depth, _, cumulative in entries if depth == 0) / 1000
+    imported = {name for name, _, _, _ in entries}
+
+    print(f"{'modul':<40}{'kumulatif':>12}{'self':>10}")
+    top = sorted((e for e in entries if e[1] <= 1), key=lambda e: -e[3])[:args.top]
+    for name, depth, self_us, cumulative_us in top:
+        print(f"{'  ' * depth + name:<40}{cumulative_us / 1000:>9.1f} ms{self_us / 1000:>7.1f} ms")
+    print(f"\nTotal impor: {total_ms:.0f} ms (anggaran {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"Melebihi anggaran sebesar {total_ms - args.budget_ms:.0f} ms.")
+        failed = True
+    eager = [name for name in args.lazy.split(",") if name and name in imported]
+    if eager:
+        print(f"Modul yang seharusnya dimuat saat dibutuhkan ikut terimpor: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Benchmark tahap-tahap pipeline EMR & HOPE pada data sintetis.
+
+Contoh::
+
+    python -m bench.run --sizes 10k,100k --output bench_report.json
+    python -m bench.run --sizes 10k,100k,1M,5M --baseline bench/baseline.json
+    python -m bench.run --sizes 10k,100k --save-baseline bench/baseline.json
+
+Setiap tahap dicatat waktu (detik) dan puncak memori (MB, via tracemalloc)
+dalam laporan JSON. Waktu diukur pada eksekusi tanpa tracemalloc; puncak
+memori diukur pada eksekusi terpisah karena tracing memperlambat tahap
+beberapa kali lipat. Ingest XLSX (EMR dan HOPE, tanpa cache disk) ikut
+diukur untuk ukuran yang muat dalam satu sheet Excel. Bila ``--baseline`` diisi, hasil dibandingkan dengan
+laporan tersimpan dan tahap yang melambat melebihi toleransi ditandai.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from bench.synthetic import make_emr, make_hope
+from engine.cleaning import clean_duplicates, convert_date_columns
+from engine.columns import EMR_COLUMNS, EMR_DATE_COLUMNS, HOPE_COLUMNS, HOPE_DATE_COLUMNS
+from engine.duplicates import detect_dup_admission_diff_created, detect_duplicates, hope_duplicate_index
+from engine.export import EXCEL_MAX_ROWS, emr_excel_bytes, frame_excel_bytes
+from engine.file_cache import FileCache
+from engine.ingest import load_first_sheet, load_sheets
+from engine.memo import frame_memo
+from engine.rollup import hope_adoption_table, hope_cube
+from engine.summary import compute_summary
+
+EMR_STAGES = [
+    "load_data", "load_data_cached", "load_xlsx", "convert_date_columns", "detect_duplicates",
+    "detect_dup_admission_diff_created", "clean_duplicates", "create_summary", "generate_excel_download",
+]
+HOPE_STAGES = ["hope_load_xlsx", "hope_duplicates", "hope_adoption"]
+
+
+def parse_size(text):
+    """Mengubah '10k' / '1M' / '5000' menjadi jumlah baris."""
+    text = text.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * factor)
+
+
+def measure(func, track_memory=True, setup=None):
+    """Menjalankan ``func`` dan mengembalikan (hasil, detik, puncak MB).
+
+    Waktu diambil dari eksekusi tanpa tracemalloc; bila ``track_memory`` True,
+    ``func`` dijalankan sekali lagi dengan tracemalloc untuk puncak memorinya.
+    ``setup()`` dipanggil sebelum setiap eksekusi (mis. mengosongkan cache).
+    """
+    def run(trace):
+        frame_memo.clear()
+        if setup is not None:
+            setup()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = func()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1e6 if trace else None
+        finally:
+            if trace:
+                tracemalloc.stop()
+        return result, seconds, peak
+
+    result, seconds, _ = run(False)
+    peak = run(True)[2] if track_memory else None
+    return result, seconds, peak
+
+
+def xlsx_input(df, stages, stage):
+    """Isi file XLSX untuk tahap ingest; None bila tahap tidak dijalankan atau data melebihi satu sheet."""
+    if stage not in stages or len(df) > EXCEL_MAX_ROWS:
+        return None
+    return frame_excel_bytes(df)
+
+
+def run_emr(rows, seed, stages, track_memory):
+    raw = make_emr(rows, seed=seed)
+    csv_bytes = raw.to_csv(index=False).encode("utf-8")
+    results = []
+
+    def record(stage, func, skip=None, setup=None):
+        if stage not in stages:
+            return None
+        if skip:
+            results.append({"dataset": "emr", "stage": stage, "rows": rows, "skipped": skip})
+            return None
+        value, seconds, peak = measure(func, track_memory, setup)
+        results.append({"dataset": "emr", "stage": stage, "rows": rows, "seconds": seconds, "peak_mb": peak})
+        return value
+
+    too_big = f"lebih dari {EXCEL_MAX_ROWS} baris Excel" if rows > EXCEL_MAX_ROWS else None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = FileCache(cache_dir, max_bytes=10**12)
+        load = lambda: load_sheets(csv_bytes, "emr.csv", cache=cache, columns=EMR_COLUMNS, date_columns=EMR_DATE_COLUMNS)
+        record("load_data", load, setup=cache.clear)
+        load()
+        record("load_data_cached", load)
+        xlsx_bytes = xlsx_input(raw, stages, "load_xlsx")
+        record("load_xlsx", lambda: load_sheets(xlsx_bytes, "emr.xlsx", cache=cache, columns=EMR_COLUMNS,
+                                                date_columns=EMR_DATE_COLUMNS, optimize=True),
+               skip=too_big, setup=cache.clear)
+
+    df = record("convert_date_columns", lambda: convert_date_columns(raw.copy()))
+    if df is None:
+        df = convert_date_columns(raw.copy())
+    record("detect_duplicates", lambda: detect_duplicates(df))
+    record("detect_dup_admission_diff_created", lambda: detect_dup_admission_diff_created(df))
+    cleaned = record("clean_duplicates", lambda: clean_duplicates(df)[0])
+    if cleaned is None:
+        cleaned = clean_duplicates(df)[0]
+    summary = record("create_summary", lambda: compute_summary(cleaned))
+    if summary is None:
+        summary = compute_summary(cleaned)
+    too_big = f"lebih dari {EXCEL_MAX_ROWS} baris Excel" if len(cleaned) > EXCEL_MAX_ROWS else None
+    record("generate_excel_download", lambda: emr_excel_bytes(cleaned, summary), skip=too_big)
+    return results
+
+
+def run_hope(rows, seed, stages, track_memory):
+    df = make_hope(rows, seed=seed)
+    results = []
+    if "hope_load_xlsx" in stages:
+        xlsx_bytes = xlsx_input(df, stages, "hope_load_xlsx")
+        if xlsx_bytes is None:
+            results.append({"dataset": "hope", "stage": "hope_load_xlsx", "rows": rows,
+                            "skipped": f"lebih dari {EXCEL_MAX_ROWS} baris Excel"})
+        else:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                cache = FileCache(cache_dir, max_bytes=10**12)
+                _, seconds, peak = measure(lambda: load_first_sheet(xlsx_bytes, "hope.xlsx", cache=cache, columns=HOPE_COLUMNS,
+                                                                    date_columns=HOPE_DATE_COLUMNS, optimize=True),
+                                           track_memory, cache.clear)
+            results.append({"dataset": "hope", "stage": "hope_load_xlsx", "rows": rows, "seconds": seconds, "peak_mb": peak})
+    df["Reg. / Adm. Date"] = pd.to_datetime(df["Reg. / Adm. Date"])
+    for stage, func in (
+        ("hope_duplicates", lambda: hope_duplicate_index(df)),
+        ("hope_adoption", lambda: hope_adoption_table(hope_cube(df))),
+    ):
+        if stage in stages:
+            _, seconds, peak = measure(func, track_memory)
+            results.append({"dataset": "hope", "stage": stage, "rows": rows, "seconds": seconds, "peak_mb": peak})
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Membandingkan hasil dengan baseline; mengembalikan daftar regresi."""
+    base = {(r["dataset"], r["stage"], r["rows"]): r for r in baseline.get("results", []) if "seconds" in r}
+    regressions = []
+    print(f"\n{'tahap':<40}{'baris':>10}{'baseline':>12}{'sekarang':>12}{'rasio':>8}")
+    for r in results:
+        key = (r["dataset"], r["stage"], r["rows"])
+        if "seconds" not in r or key not in base:
+            continue
+        ratio = r["seconds"] / base[key]["seconds"] if base[key]["seconds"] else float("inf")
+        flag = " !" if ratio > 1 + tolerance else ""
+        print(f"{r['dataset'] + '.' + r['stage']:<40}{r['rows']:>10}{base[key]['seconds']:>12.3f}{r['seconds']:>12.3f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append({**r, "baseline_seconds": base[key]["seconds"], "ratio": ratio})
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline EMR & HOPE dengan data sintetis.")
+    parser.add_argument("--sizes", default="10k,100k,1M,5M", help="Daftar ukuran data (default: 10k,100k,1M,5M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", help=f"Tahap yang dijalankan, dipisah koma (default: semua): {','.join(EMR_STAGES + HOPE_STAGES)}")
+    parser.add_argument("--no-memory", action="store_true", help="Tanpa pengukuran memori (tracemalloc)")
+    parser.add_argument("--output", default="bench_report.json", help="File laporan JSON")
+    parser.add_argument("--baseline", help="Laporan JSON pembanding")
+    parser.add_argument("--save-baseline", help="Simpan laporan ini juga sebagai baseline di path tersebut")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Toleransi perlambatan sebelum dianggap regresi (default: 0.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stages = set(args.stages.split(",")) if args.stages else set(EMR_STAGES + HOPE_STAGES)
+    results = []
+    for rows in (parse_size(s) for s in args.sizes.split(",")):
+        for r in run_emr(rows, args.seed, stages, not args.no_memory) + run_hope(rows, args.seed, stages, not args.no_memory):
+            results.append(r)
+            if "skipped" in r:
+                print(f"{r['dataset']}.{r['stage']:<36}{r['rows']:>10}  dilewati: {r['skipped']}")
+            else:
+                peak = f"{r['peak_mb']:>10.1f} MB" if r["peak_mb"] is not None else ""
+                print(f"{r['dataset']}.{r['stage']:<36}{r['rows']:>10}{r['seconds']:>10.3f} s{peak}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} tahap melambat lebih dari {args.tolerance:.0%} dibanding baseline.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Generator data sintetis berbentuk ekstrak EMR dan HOPE (deterministik per seed)."""
+import numpy as np
+import pandas as pd
+
+from engine.columns import HOPE_UNITS
+
+START = np.datetime64("2024-01-01T00:00:00")
+
+
+def _with_nulls(values, rng, rate):
+    series = pd.Series(values)
+    return series.where(rng.random(len(series)) >= rate)
+
+
+def _codes(prefix, ids):
+    return prefix + pd.Series(ids).astype(str)
+
+
+def make_emr(n, seed=0, days=90, null_rate=0.08, dup_rate=0.05, readmit_rate=0.02, extra_columns=0):
+    """Membuat data EMR sintetis berukuran ``n`` baris.
+
+    ``dup_rate`` adalah porsi baris salinan persis (admission_no & created_date sama),
+    ``readmit_rate`` porsi admission_no berulang dengan created_date berbeda, dan
+    ``null_rate`` porsi admission_no kosong.
+    """
+    rng = np.random.default_rng(seed)
+    n_dup = int(n * dup_rate)
+    n_base = n - n_dup
+    admission = START + rng.integers(0, days * 86400, n_base).astype("timedelta64[s]")
+    created = admission + rng.integers(0, 3600, n_base).astype("timedelta64[s]")
+    ids = np.arange(n_base)
+    readmit = rng.random(n_base) < readmit_rate
+    ids[readmit] = rng.integers(0, n_base, int(readmit.sum()))
+    df = pd.DataFrame({
+        "created_date": created,
+        "admission_date": admission,
+        "admission_no": _with_nulls(_codes("ADM", ids), rng, null_rate),
+        "nurse_assessor": _with_nulls(_codes("NURSE", rng.integers(0, 200, n_base)), rng, 0.25),
+        "assigned_doctor_name": _with_nulls(_codes("DR", rng.integers(0, 80, n_base)), rng, 0.35),
+        "ed_discharge_plan": _with_nulls(rng.choice(["HOME", "IPD", "PASSAWAY", "REFER"], n_base, p=[0.6, 0.3, 0.01, 0.09]), rng, 0.05),
+        "reviewed_medical_equipment": _with_nulls(rng.choice(["Ya", "Tidak"], n_base, p=[0.7, 0.3]), rng, 0.1),
+        "status_discharge": _with_nulls(rng.choice(["APPROVED", "PENDING"], n_base, p=[0.85, 0.15]), rng, 0.05),
+    })
+    for i in range(extra_columns):
+        df[f"extra_{i}"] = rng.integers(0, 1000, n_base)
+    if n_dup:
+        dups = df.iloc[rng.integers(0, n_base, n_dup)]
+        df = pd.concat([df, dups], ignore_index=True)
+        df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+    # Tanggal dikirim sebagai teks seperti pada ekspor rumah sakit
+    for col in ("created_date", "admission_date"):
+        df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return df
+
+
+def make_hope(n, seed=0, days=90, cancel_rate=0.03, same_day_rate=0.02, unit=None):
+    """Membuat data HOPE sintetis berukuran ``n`` baris."""
+    rng = np.random.default_rng(seed)
+    reg = START + rng.integers(0, days * 86400, n).astype("timedelta64[s]")
+    names = _codes("PASIEN ", rng.integers(0, max(n, 1) * 5, n))
+    same_day = np.flatnonzero(rng.random(n) < same_day_rate)
+    if len(same_day):
+        # Pasien yang terdaftar dua kali pada hari yang sama
+        src = rng.integers(0, n, len(same_day))
+        names.iloc[same_day] = names.iloc[src].to_numpy()
+        reg[same_day] = reg[src].astype("datetime64[D]") + rng.integers(0, 86400, len(same_day)).astype("timedelta64[s]")
+    unit = unit or HOPE_UNITS[0]
+    return pd.DataFrame({
+        "Reg. / Adm. Date": pd.Series(reg).dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "Reg. / Adm. No": _codes(f"{unit}-", rng.integers(0, n * 10, n)),
+        "Name": names,
+        "Status": rng.choice(["Registered", "Cancelled"], n, p=[1 - cancel_rate, cancel_rate]),
+    })
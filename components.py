@@ -0,0 +1,262 @@
+"""Komponen halaman dashboard yang dipakai ulang di setiap rerun.
+
+Modul ini diimpor sekali per proses (bukan dieksekusi ulang seperti script
+app.py), sehingga fungsi, closure, dan dekorator cache Streamlit hanya
+didefinisikan sekali. Plotly dan openpyxl tidak diimpor di sini; keduanya
+dimuat saat grafik atau file Excel pertama dibuat (atau oleh engine.warmup).
+"""
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from engine.columns import EMR_COLUMNS, EMR_DATE_COLUMNS
+from engine.dtypes import report_text
+from engine.ingest import open_workbook
+from engine.jobs import CANCELLED, FAILED
+from engine.paging import paged_frame
+from engine.profiling import StageProfiler, profiling_default
+from engine.result_cache import fingerprint, get_result_cache
+from engine.stages import emr_summary, parse_sheet_job, trend_table
+from engine.charts import trend_figure
+
+
+def create_profiler(module):
+    """Membuat StageProfiler untuk rerun ini beserta panel profiling di sidebar."""
+    enabled = st.sidebar.checkbox("Profiling per tahap", value=profiling_default(), key=f"profiling_{module}")
+    if not enabled:
+        return StageProfiler(module, enabled=False)
+    panel = st.sidebar.expander("⏱️ Profiling Rerun Ini", expanded=True)
+    deep_memory = panel.checkbox("Hitung memori isi kolom teks (lebih lambat)", key=f"profiling_deep_{module}")
+    placeholder = panel.empty()
+
+    def render(profiler):
+        with placeholder.container():
+            st.caption(f"Rerun {profiler.rerun_id}: {len(profiler.records)} panggilan, {profiler.total_seconds:.2f} detik")
+            table = profiler.table()
+            st.dataframe(table)
+            repeated = table.index[table["calls"] > 1].tolist()
+            if repeated:
+                st.warning(f"Dihitung lebih dari sekali di rerun ini: {', '.join(repeated)}")
+
+    profiler = StageProfiler(module, deep_memory=deep_memory, on_record=render)
+    render(profiler)
+    return profiler
+
+
+def paginated_table(df, key, sort_by=None, ascending=True, page_sizes=(50, 100, 500)):
+    """Menampilkan DataFrame per halaman; filter dan pengurutan dikerjakan di server."""
+    paged = paged_frame(df)
+    columns = list(df.columns)
+    controls = st.columns([0.35, 0.2, 0.2, 0.25])
+    sort_options = [None] + columns
+    sort_by = controls[0].selectbox("Urutkan menurut", sort_options, key=f"{key}_sort",
+                                    index=sort_options.index(sort_by) if sort_by in sort_options else 0,
+                                    format_func=lambda col: "(urutan asli)" if col is None else str(col))
+    ascending = controls[1].radio("Arah", [True, False], index=0 if ascending else 1, key=f"{key}_asc",
+                                  format_func=lambda asc: "Naik" if asc else "Turun", horizontal=True)
+    page_size = controls[2].selectbox("Baris per halaman", page_sizes, key=f"{key}_size")
+    filters = {}
+    if paged.filter_columns:
+        with st.expander("Filter Kolom"):
+            filter_cols = st.columns(min(len(paged.filter_columns), 4))
+            for i, col in enumerate(paged.filter_columns):
+                filters[col] = filter_cols[i % len(filter_cols)].text_input(str(col), key=f"{key}_filter_{col}").strip()
+    n_rows = paged.count(filters)
+    n_pages = max(1, -(-n_rows // page_size))
+    page = controls[3].number_input(f"Halaman (dari {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page")
+    page = min(int(page), n_pages)
+    st.dataframe(paged.page(page, page_size, sort_by, ascending, filters))
+    first = (page - 1) * page_size + 1 if n_rows else 0
+    st.caption(f"Menampilkan baris {first}–{min(page * page_size, n_rows)} dari {n_rows} "
+               f"(total {paged.total_rows} baris sebelum filter)")
+
+
+def show_result_cache_stats():
+    """Menampilkan isi dan rasio hit cache hasil bersama di sidebar."""
+    stats = get_result_cache().stats()
+    st.sidebar.caption(f"Cache hasil bersama: {stats['entries']} hasil, {stats['bytes'] / 1e6:.0f} / "
+                       f"{stats['max_bytes'] / 1e6:.0f} MB, hit {stats['hits']} / miss {stats['misses']} "
+                       f"({stats['hit_rate']:.0%})")
+
+
+JOB_POLL_SECONDS = 0.5
+
+
+def job_subscriber(key):
+    """Identitas pelanggan job untuk session ini dan panel ``key`` (lihat ``Job.subscribe``)."""
+    if "job_session_id" not in st.session_state:
+        st.session_state.job_session_id = uuid.uuid4().hex
+    return f"{st.session_state.job_session_id}:{key}"
+
+
+def job_panel(job, key):
+    """Menampilkan progres job latar dan tombol batal; halaman dimuat ulang saat job selesai.
+
+    Job dapat ditunggu session lain: tombol batal hanya melepas session ini dan
+    job baru berhenti bila tidak ada session lain yang menunggunya.
+    """
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def panel():
+        if job.finished:
+            st.rerun()
+        st.progress(job.progress, text=f"{job.label}: {job.message or 'sedang berjalan'} ({job.elapsed:.0f} detik)")
+        if st.button("Batalkan", key=f"{key}_cancel"):
+            job.cancel(job_subscriber(key))
+            st.session_state[f"{key}_cancelled"] = True
+            st.rerun()
+
+    panel()
+
+
+def tracked_job(runner, state_key):
+    """Job latar yang dicatat di ``st.session_state[state_key]`` bila sudah selesai dengan sukses.
+
+    Job harus di-submit dengan ``subscriber=job_subscriber(state_key)``. Selama
+    job berjalan (juga setelah rerun) panel progresnya ditampilkan dan None
+    dikembalikan. Catatan job dihapus setelah selesai; job yang gagal, dibatalkan
+    session ini, atau sudah tidak tersedia hanya menampilkan pesan.
+    """
+    job_key = st.session_state.get(state_key)
+    if job_key is None:
+        return None
+    job = runner.get(job_key)
+    if st.session_state.pop(f"{state_key}_cancelled", False):
+        del st.session_state[state_key]
+        st.warning(f"{job.label if job is not None else 'Job'} dibatalkan.")
+        return None
+    if job is None:
+        del st.session_state[state_key]
+        st.warning("Hasil job tidak lagi tersedia di server; jalankan ulang prosesnya.")
+        return None
+    if not job.finished:
+        job_panel(job, state_key)
+        return None
+    del st.session_state[state_key]
+    runner.collect(job_key, job_subscriber(state_key))
+    if job.status == FAILED:
+        st.error(f"{job.label} gagal: {job.error}")
+        return None
+    if job.status == CANCELLED:
+        st.warning(f"{job.label} dibatalkan.")
+        return None
+    return job
+
+
+# Workbook unggahan (isi file dan daftar sheet) yang dipakai bersama session; dibatasi jumlah dan umurnya
+UPLOAD_CACHE_ENTRIES = 8
+UPLOAD_CACHE_TTL = 3600
+
+
+@st.cache_resource(show_spinner=False, max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL)
+def _open_upload(uploaded_file, keep_all_columns):
+    columns = None if keep_all_columns else EMR_COLUMNS
+    return open_workbook(uploaded_file, columns=columns, date_columns=EMR_DATE_COLUMNS, optimize=True)
+
+
+def load_data(uploaded_file, keep_all_columns=False):
+    """Membuka file CSV atau Excel dengan penanganan error; sheet di-parse saat dipilih.
+
+    Tanpa ``keep_all_columns`` hanya kolom EMR yang dibaca dan kolom tanggal langsung dikonversi.
+    Tipe kolom setiap sheet diringkas (categorical, downcast numerik) setelah dimuat.
+    Setiap pemanggil mendapat view workbook sendiri; sheet yang dimuat tidak dibagi antar session.
+    """
+    try:
+        sheets = _open_upload(uploaded_file, keep_all_columns).view()
+        return {"sheets": sheets, "multiple": len(sheets) > 1}
+    except Exception as e:
+        st.error(f"Gagal membaca file: {e}")
+        return None
+
+
+def show_parse_times(sheets, sheet_names):
+    """Menampilkan waktu parse dan hasil optimasi tipe data per sheet."""
+    for name in sheet_names:
+        if name in sheets.parse_times:
+            source = "cache" if sheets.from_cache.get(name) else "parse"
+            st.caption(f"Sheet '{name}': {sheets.parse_times[name]:.2f} detik ({source})")
+        if name in sheets.dtype_reports:
+            st.caption(report_text(sheets.dtype_reports[name]))
+
+
+def get_raw_sheet(runner, tab_state, sheets, sheet_name, profiler=None):
+    """Mengambil data mentah sheet tanpa salinan; dipakai ulang selama sheet tidak berganti.
+
+    Sheet di-parse di latar; selama job berjalan panel progres ditampilkan dan None dikembalikan.
+    """
+    if tab_state.selected_sheet == sheet_name and tab_state.raw is not None:
+        return tab_state.raw
+    job_key = ("parse_sheet", fingerprint(sheets.key, sheet_name, sheets.columns, sheets.optimize))
+    panel_key = f"parse_{job_key[1]}"
+    job = runner.get(job_key)
+    cancelled = st.session_state.get(f"{panel_key}_cancelled") or (job is not None and job.status == CANCELLED)
+    if cancelled and not st.button("Parse Ulang", key=f"reparse_{job_key[1]}"):
+        st.warning(f"Parse sheet '{sheet_name}' dibatalkan.")
+        return None
+    st.session_state.pop(f"{panel_key}_cancelled", None)
+    subscriber = job_subscriber(panel_key)
+    # Data mentah tidak masuk cache hasil bersama: frame-nya milik tab (dapat di-spill) dan cache disk.
+    # Job yang sudah dibuang sebelum hasilnya diambil cukup di-submit ulang (dibaca dari cache disk).
+    job = runner.submit(*job_key, parse_sheet_job, sheets, sheet_name, profiler=profiler, cache=False,
+                        label=f"Parse sheet '{sheet_name}'", subscriber=subscriber)
+    if not job.finished:
+        job_panel(job, panel_key)
+        return None
+    runner.collect(job_key, subscriber)
+    if job.status == FAILED:
+        st.error(f"Gagal membaca sheet '{sheet_name}': {job.error}")
+        return None
+    if job.status == CANCELLED:
+        st.warning(f"Parse sheet '{sheet_name}' dibatalkan.")
+        return None
+    # Hasil parse disimpan di tab; catatan job dibuang setelah semua session yang menunggu mengambilnya
+    runner.discard(job_key)
+    tab_state.set_raw(sheet_name, None)
+    return job.result
+
+
+def data_overview(df):
+    """Menampilkan ringkasan data."""
+    st.write("**Jumlah Kolom:**", df.shape[1])
+    st.write("**Jumlah Baris:**", df.shape[0])
+    st.write("**Missing Values per Kolom:**")
+    st.write(df.isnull().sum())
+
+
+def create_summary(df, granularity="day", start_dt=None, end_dt=None):
+    """Membuat ringkasan adopsi EMR berdasarkan admission_date dari kubus rollup per jam."""
+    if "admission_date" not in df.columns:
+        st.error("Kolom admission_date tidak ditemukan.")
+    return emr_summary(df, granularity, start_dt, end_dt)
+
+
+def plot_trends(df_cleaned, granularity, window, selected_metrics):
+    """Membuat grafik tren metrik terpilih beserta granularitas yang ditampilkan.
+
+    Titik yang terlalu banyak diagregasi ke minggu/bulan. Tabel grafik
+    di-cache per (data, rentang, granularitas) dan grafik per kombinasi
+    metrik, sehingga mengganti metrik tidak mengagregasi ulang data.
+    """
+    result_cache = get_result_cache()
+    base_key = fingerprint(df_cleaned, window, granularity)
+    table, shown, x = result_cache.get_or_compute("trend_base", base_key, lambda: trend_table(df_cleaned, granularity, window))
+    fig = result_cache.get_or_compute("trend_figure", fingerprint(base_key, tuple(selected_metrics)),
+                                      lambda: trend_figure(table, selected_metrics, shown, x))
+    return fig, shown
+
+
+def parse_time_input(time_str):
+    """Mengonversi input waktu ke format time dengan validasi."""
+    try:
+        return datetime.strptime(time_str.strip(), "%H:%M").time()
+    except ValueError:
+        st.error("Format waktu harus HH:MM (misalnya, 23:59).")
+        return None
+
+
+def upload_key(file, columns):
+    """Sidik konten file HOPE unggahan dan kolom yang dibaca (hash dihitung sekali per file)."""
+    cached = st.session_state.get("hope_upload_hash")
+    if cached is None or cached[0] != file.file_id:
+        cached = st.session_state.hope_upload_hash = (file.file_id, fingerprint(file))
+    return fingerprint(cached[1], columns)
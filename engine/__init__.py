@@ -0,0 +1,9 @@
+"""Komponen pengolahan data EMR & HOPE yang dapat dipakai tanpa Streamlit."""
+from engine.summary import (
+    METRICS,
+    SUMMARY_COLUMNS,
+    compute_summary,
+    percentage_per_day,
+    percentage_total,
+    total_row,
+)
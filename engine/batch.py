@@ -0,0 +1,84 @@
+"""Perintah batch untuk menjalankan pipeline EMR/HOPE tanpa UI.
+
+Contoh::
+
+    python -m engine.batch emr data/emr/ --output-dir hasil/ --remove-no-epa
+    python -m engine.batch hope data/hope/ --start 2024-01-01 --end 2024-01-31 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from engine.pipeline import run_batch
+
+EXTENSIONS = {"emr": (".csv", ".xlsx"), "hope": (".xlsx",)}
+
+
+def find_files(input_dir, kind):
+    """Mencari file ekstrak di direktori sesuai jenis data."""
+    return sorted(
+        os.path.join(input_dir, name)
+        for name in os.listdir(input_dir)
+        if name.lower().endswith(EXTENSIONS[kind]) and not name.startswith("~$")
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Proses batch ekstrak EMR/HOPE menjadi file Excel laporan adopsi.")
+    parser.add_argument("kind", choices=["emr", "hope"], help="Jenis data")
+    parser.add_argument("input_dir", help="Direktori berisi file ekstrak")
+    parser.add_argument("--output-dir", default="output", help="Direktori tujuan file Excel (default: output)")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker process (default: jumlah core)")
+    parser.add_argument("--start", help="Awal rentang tanggal (EMR: YYYY-MM-DD[ HH:MM], HOPE: YYYY-MM-DD)")
+    parser.add_argument("--end", help="Akhir rentang tanggal (inklusif)")
+    parser.add_argument("--remove-no-epa", action="store_true", help="EMR: hapus baris tanpa admission_no")
+    parser.add_argument("--keep-all-columns", action="store_true", help="EMR: pertahankan semua kolom di Cleaned_Data")
+    parser.add_argument("--unit", help="HOPE: kode unit untuk nama file (default: ditebak dari nama file)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = find_files(args.input_dir, args.kind)
+    if not paths:
+        print(f"Tidak ada file {'/'.join(EXTENSIONS[args.kind])} di {args.input_dir}", file=sys.stderr)
+        return 1
+
+    if args.kind == "emr":
+        options = {
+            "remove_no_epa": args.remove_no_epa,
+            "keep_all_columns": args.keep_all_columns,
+            "start": pd.Timestamp(args.start) if args.start else None,
+            "end": pd.Timestamp(args.end) if args.end else None,
+        }
+    else:
+        options = {
+            "unit": args.unit,
+            "start_date": pd.Timestamp(args.start).date() if args.start else None,
+            "end_date": pd.Timestamp(args.end).date() if args.end else None,
+        }
+
+    started = time.perf_counter()
+    results = run_batch(args.kind, paths, args.output_dir, args.workers, **options)
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for r in results:
+        label = f"{r['file']} [{r['sheet']}]" if r["sheet"] else r["file"]
+        if r["error"]:
+            failed += 1
+            print(f"GAGAL  {label}: {r['error']}")
+        else:
+            print(f"OK     {label}: {r['rows']} baris → {r['rows_cleaned']} baris, "
+                  f"{r['seconds']:.2f} s ({r['rows_per_sec']:,.0f} baris/s) → {r['output']}")
+    total_rows = sum(r["rows"] for r in results)
+    print(f"Selesai: {len(paths)} file, {total_rows} baris dalam {elapsed:.2f} s "
+          f"({total_rows / elapsed if elapsed else 0:,.0f} baris/s), {failed} gagal.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Grafik tren metrik summary untuk rentang tanggal panjang.
+
+Bila jumlah titik per seri melebihi MAX_POINTS, tabel diagregasi ulang dari
+kubus rollup ke resolusi yang lebih kasar (jam/shift → hari → minggu → bulan).
+Seri besar digambar dengan trace WebGL (Scattergl) dan marker hanya dipasang
+pada seri pendek sehingga payload grafik dan interaksi (geser/zoom) tetap
+ringan. Plotly baru diimpor saat grafik dibuat.
+"""
+import pandas as pd
+
+from engine.rollup import GRANULARITIES
+from engine.summary import DAY_FORMAT
+
+MAX_POINTS = 400
+WEBGL_POINTS = 1000
+MARKER_POINTS = 100
+
+COARSER = {"hour": "day", "shift": "day", "day": "week", "week": "month"}
+# Format label index per granularitas untuk sumbu waktu; shift tetap berupa label teks
+AXIS_FORMATS = {"hour": f"{DAY_FORMAT} %H:00", "day": DAY_FORMAT, "week": DAY_FORMAT, "month": "%b-%Y"}
+
+
+def trend_view(cube, granularity="day", start=None, end=None, max_points=MAX_POINTS):
+    """Tabel metrik untuk grafik beserta granularitas yang dipakai.
+
+    Granularitas dinaikkan (mis. hari → minggu → bulan) selama jumlah titik
+    melebihi ``max_points``.
+    """
+    table = cube.view(granularity, start, end)
+    while len(table) > max_points and granularity in COARSER:
+        granularity = COARSER[granularity]
+        table = cube.view(granularity, start, end)
+    return table, granularity
+
+
+def trend_axis(table, granularity):
+    """Nilai sumbu x: tanggal untuk jam/hari/minggu/bulan, label teks untuk shift."""
+    fmt = AXIS_FORMATS.get(granularity)
+    return pd.to_datetime(table.index, format=fmt) if fmt else table.index
+
+
+def trend_figure(table, metrics, granularity, x=None):
+    """Grafik garis metrik terpilih; seri dengan total titik > WEBGL_POINTS memakai Scattergl."""
+    import plotly.graph_objects as go
+
+    x = trend_axis(table, granularity) if x is None else x
+    trace = go.Scattergl if len(table) * len(metrics) > WEBGL_POINTS else go.Scatter
+    mode = "lines+markers" if len(table) <= MARKER_POINTS else "lines"
+    fig = go.Figure([trace(x=x, y=table[metric].to_numpy(), mode=mode, name=metric) for metric in metrics])
+    fig.update_layout(title=f"Tren Metrik {GRANULARITIES[granularity]}", hovermode="x unified", template="plotly_white",
+                      xaxis_title=table.index.name, yaxis_title="value", legend_title_text="variable")
+    return fig
@@ -0,0 +1,71 @@
+"""Pembersihan duplikat data EMR tanpa ketergantungan pada Streamlit."""
+import numpy as np
+import pandas as pd
+
+from engine.columns import EMR_DATE_COLUMNS
+
+DEDUP_KEYS = ["admission_no", "created_date"]
+
+
+def convert_date_columns(df, columns=None):
+    """Mengonversi kolom tanggal ke format datetime dengan error handling.
+
+    DataFrame masukan tidak diubah; bila semua kolom sudah bertipe datetime
+    (dikonversi saat ingest), objek yang sama dikembalikan tanpa salinan.
+    """
+    converted = {
+        col: pd.to_datetime(df[col], errors="coerce")
+        for col in columns or EMR_DATE_COLUMNS
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col])
+    }
+    return df.assign(**converted) if converted else df
+
+
+def cleaning_message(before, removed_dup, removed_no_epa, remaining):
+    """Menyusun pesan hasil pembersihan yang ditampilkan ke pengguna."""
+    return (f"<b>Pembersihan Selesai:</b><br>"
+            f"Duplikat dihapus: {removed_dup} baris.<br>"
+            f"Baris tanpa admission dihapus: {removed_no_epa} baris.<br>"
+            f"Total baris dihapus: {before - remaining}.<br>"
+            f"Sisa data: {remaining} baris.")
+
+
+def first_occurrence(df, columns, check=None):
+    """Mask kemunculan pertama setiap kombinasi ``columns`` (setara ``~df.duplicated(keep="first")``).
+
+    Setiap kolom difaktorkan terpisah (NaN dianggap satu nilai) lalu kodenya
+    digabung; ``check()`` dipanggil di antara kolom sebagai titik pembatalan.
+    """
+    key = np.zeros(len(df), dtype=np.int64)
+    for col in columns:
+        if check is not None:
+            check()
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        key, _ = pd.factorize(key * len(uniques) + codes)
+    if check is not None:
+        check()
+    # Kode faktor diberikan menurut urutan kemunculan: baris pertama suatu kunci menaikkan maksimum berjalan
+    running = np.maximum.accumulate(key) if len(key) else key
+    return np.r_[True, running[1:] > running[:-1]] if len(key) else np.ones(0, dtype=bool)
+
+
+def cleaning_mask(df, remove_no_epa=False, check=None):
+    """Mask baris yang dipertahankan oleh ``clean_duplicates`` beserta pesan hasilnya."""
+    before = df.shape[0]
+    if all(c in df.columns for c in DEDUP_KEYS):
+        keep = first_occurrence(df, DEDUP_KEYS, check)
+    else:
+        keep = np.ones(before, dtype=bool)
+    removed_dup = before - int(keep.sum())
+    removed_no_epa_count = 0
+    if remove_no_epa and "admission_no" in df.columns:
+        no_epa = keep & df["admission_no"].isnull().to_numpy()
+        removed_no_epa_count = int(no_epa.sum())
+        keep &= ~no_epa
+    return keep, cleaning_message(before, removed_dup, removed_no_epa_count, int(keep.sum()))
+
+
+def clean_duplicates(df, remove_no_epa=False):
+    """Membersihkan duplikat dan menghapus baris tanpa admission_no jika diinginkan."""
+    keep, msg = cleaning_mask(df, remove_no_epa)
+    return df[keep], msg
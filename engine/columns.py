@@ -0,0 +1,16 @@
+"""Daftar kolom yang dipakai modul EMR dan HOPE."""
+
+EMR_DATE_COLUMNS = ["created_date", "admission_date"]
+EMR_COLUMNS = EMR_DATE_COLUMNS + [
+    "admission_no",
+    "nurse_assessor",
+    "assigned_doctor_name",
+    "ed_discharge_plan",
+    "reviewed_medical_equipment",
+    "status_discharge",
+]
+
+HOPE_DATE_COLUMNS = ["Reg. / Adm. Date"]
+HOPE_COLUMNS = ["Reg. / Adm. Date", "Reg. / Adm. No", "Name", "Status"]
+
+HOPE_UNITS = ["SHDP", "SHSB", "SHLV", "SHKJ", "SHKD", "SHYG", "MRCCC"]
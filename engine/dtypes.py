@@ -0,0 +1,116 @@
+"""Optimasi tipe data DataFrame EMR/HOPE setelah ingest.
+
+Kolom teks berkardinalitas rendah (rencana pulang, status, nama perawat,
+dokter, ...) diubah menjadi categorical sehingga perbandingan seperti
+``== "HOME"`` cukup membandingkan kode integer. Kolom numerik diperkecil
+tanpa kehilangan nilai. Kolom yang hanya dibutuhkan keberadaannya dapat
+disimpan sebagai boolean.
+"""
+import numpy as np
+import pandas as pd
+
+# Kolom teks menjadi categorical bila nilai unik <= porsi ini dari baris terisi
+CATEGORY_MAX_RATIO = 0.5
+
+# Kolom EMR yang bagi summary cukup diketahui terisi atau tidak
+PRESENCE_COLUMNS = ["admission_no", "nurse_assessor", "assigned_doctor_name"]
+
+
+def is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def presence(series):
+    """Mask baris terisi; kolom yang sudah disimpan sebagai flag boolean dipakai apa adanya."""
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=bool)
+    return series.notna().to_numpy(dtype=bool)
+
+
+def _downcast_float(series):
+    small = series.astype(np.float32)
+    same = (small.astype(np.float64) == series) | series.isna()
+    return small if same.all() else series
+
+
+def _optimized(series, as_presence):
+    if as_presence:
+        return series if pd.api.types.is_bool_dtype(series.dtype) else series.notna()
+    if is_text(series):
+        filled = int(series.notna().sum())
+        if filled and series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * filled:
+            return series.astype("category")
+        return series
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    if pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return pd.to_numeric(series, downcast="unsigned" if len(series) and series.min() >= 0 else "integer")
+    if pd.api.types.is_float_dtype(series.dtype) and series.dtype != np.float32 \
+            and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return _downcast_float(series)
+    return series
+
+
+def optimize_dtypes(df, presence_columns=()):
+    """Mengubah tipe kolom ke bentuk ringkas; DataFrame masukan tidak diubah.
+
+    Mengembalikan ``(df_optimal, report)``; ``report`` berisi ``before_bytes``,
+    ``after_bytes``, ``saved_bytes``, dan ``changes`` ({kolom: "lama -> baru"}).
+    Kolom di ``presence_columns`` disimpan sebagai flag boolean "terisi".
+    """
+    before = int(df.memory_usage(index=True, deep=True).sum())
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        new = _optimized(series, col in presence_columns)
+        if new is not series and new.dtype != series.dtype:
+            converted[col] = new
+    result = df
+    if converted:
+        result = df.copy(deep=False)
+        for col, new in converted.items():
+            result[col] = new
+    after = int(result.memory_usage(index=True, deep=True).sum()) if converted else before
+    report = {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_bytes": before - after,
+        "changes": {col: f"{df[col].dtype} -> {new.dtype}" for col, new in converted.items()},
+    }
+    return result, report
+
+
+def _categories(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.categories
+    return pd.Index(series.dropna().unique())
+
+
+def concat_frames(frames):
+    """Menggabungkan DataFrame berkolom sama; kolom categorical tetap categorical dengan kategori gabungan.
+
+    ``pd.concat`` mengubah categorical berkategori berbeda menjadi object, sehingga
+    kategori setiap bagian disamakan lebih dulu.
+    """
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0]
+    aligned = {}
+    for col in frames[0].columns:
+        parts = [frame[col] for frame in frames]
+        if not any(isinstance(part.dtype, pd.CategoricalDtype) for part in parts) \
+                or all(part.dtype == parts[0].dtype for part in parts):
+            continue
+        categories = _categories(parts[0])
+        for part in parts[1:]:
+            categories = categories.union(_categories(part), sort=False)
+        aligned[col] = pd.CategoricalDtype(categories)
+    if aligned:
+        frames = [frame.astype(aligned) for frame in frames]
+    return pd.concat(frames)
+
+
+def report_text(report):
+    """Ringkasan laporan optimasi untuk ditampilkan."""
+    return (f"Optimasi tipe data: {report['before_bytes'] / 1e6:.1f} MB → {report['after_bytes'] / 1e6:.1f} MB "
+            f"(hemat {report['saved_bytes'] / 1e6:.1f} MB, {len(report['changes'])} kolom)")
@@ -0,0 +1,166 @@
+"""Analisis duplikat EMR dan HOPE dalam satu kali proses vektor.
+
+Semua tabel duplikat (admission_no, created_date, gabungan, tanpa admission,
+admission_no dengan created_date berbeda) diambil sebagai potongan dari satu
+objek DuplicateIndex yang di-memo per DataFrame. HOPE memakai
+HopeDuplicateIndex dengan pola yang sama.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.memo import frame_memo
+from engine.summary import day_keys
+
+HOPE_DATE_COL = "Reg. / Adm. Date"
+HOPE_ADMISSION_COL = "Reg. / Adm. No"
+HOPE_NAME_COL = "Name"
+
+
+def _group_codes(values, dropna):
+    """Mengembalikan kode grup dan ukuran grup per baris."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=dropna)
+    sizes = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    row_sizes = np.where(codes >= 0, sizes[np.maximum(codes, 0)], 0)
+    return codes, len(uniques), row_sizes
+
+
+class DuplicateIndex:
+    """Indeks duplikat EMR: kode grup, ukuran grup, dan jumlah created_date unik per admission_no."""
+
+    def __init__(self, df):
+        self.df = df
+        self.has_admission = "admission_no" in df.columns
+        self.has_created = "created_date" in df.columns
+        self._tables = {}
+        n = len(df)
+
+        if self.has_admission:
+            self.admission_codes, n_adm, self.admission_sizes = _group_codes(df["admission_no"], dropna=True)
+            self.no_epa_mask = self.admission_codes < 0
+        else:
+            self.admission_codes = np.full(n, -1)
+            self.admission_sizes = np.zeros(n, dtype=np.int64)
+            self.no_epa_mask = np.zeros(n, dtype=bool)
+            n_adm = 0
+
+        if self.has_created:
+            # NaT dianggap satu grup, sama seperti df.duplicated
+            self.created_codes, n_created, self.created_sizes = _group_codes(df["created_date"], dropna=False)
+        else:
+            self.created_codes = np.full(n, -1)
+            self.created_sizes = np.zeros(n, dtype=np.int64)
+
+        # Jumlah created_date unik (tanpa NaT) per admission_no
+        self.created_per_admission = np.zeros(n_adm, dtype=np.int64)
+        if self.has_admission and self.has_created:
+            valid = (self.admission_codes >= 0) & df["created_date"].notna().to_numpy()
+            pairs = np.unique(self.admission_codes[valid].astype(np.int64) * n_created + self.created_codes[valid])
+            self.created_per_admission = np.bincount(pairs // n_created, minlength=n_adm) if n_created else self.created_per_admission
+
+        self.dup_epa_mask = (self.admission_codes >= 0) & (self.admission_sizes > 1)
+        self.dup_created_mask = self.created_sizes > 1 if self.has_created else np.zeros(n, dtype=bool)
+        self.diff_created_mask = np.zeros(n, dtype=bool)
+        if self.has_admission and self.has_created:
+            has_code = self.admission_codes >= 0
+            self.diff_created_mask[has_code] = self.created_per_admission[self.admission_codes[has_code]] > 1
+
+    def _table(self, name, build):
+        if name not in self._tables:
+            self._tables[name] = build()
+        return self._tables[name]
+
+    def _sorted(self, frame):
+        return frame.sort_values(by="created_date") if self.has_created else frame
+
+    @property
+    def no_epa_count(self):
+        return int(self.no_epa_mask.sum())
+
+    def dup_epa(self):
+        """Baris dengan admission_no (tidak kosong) yang muncul lebih dari sekali."""
+        if not self.has_admission:
+            return pd.DataFrame()
+        return self._table("dup_epa", lambda: self.df[self.dup_epa_mask])
+
+    def dup_created(self):
+        """Baris dengan created_date yang muncul lebih dari sekali."""
+        if not self.has_created:
+            return pd.DataFrame()
+        return self._table("dup_created", lambda: self.df[self.dup_created_mask])
+
+    def no_epa(self):
+        """Baris tanpa admission_no."""
+        if not self.has_admission:
+            return pd.DataFrame()
+        return self._table("no_epa", lambda: self.df[self.no_epa_mask])
+
+    def combined(self):
+        """Gabungan duplikat admission_no dan created_date, diurutkan menurut created_date."""
+        if not self.dup_epa_mask.any() and not self.dup_created_mask.any():
+            return pd.DataFrame()
+        return self._table("combined", lambda: self._sorted(self.df[self.dup_epa_mask | self.dup_created_mask]))
+
+    def admission_diff_created(self):
+        """Baris admission_no duplikat dengan created_date berbeda, diurutkan menurut created_date."""
+        if not (self.has_admission and self.has_created):
+            return pd.DataFrame()
+        return self._table("diff_created", lambda: self._sorted(self.df[self.diff_created_mask]))
+
+
+def duplicate_index(df):
+    """Mengambil DuplicateIndex untuk DataFrame (di-memo selama objeknya tidak berubah)."""
+    return frame_memo.get(df, "duplicate_index", DuplicateIndex)
+
+
+def detect_duplicates(df):
+    """Mendeteksi duplikat berdasarkan admission_no dan created_date."""
+    dup_index = duplicate_index(df)
+    return dup_index.dup_epa(), dup_index.dup_created(), dup_index.combined(), dup_index.no_epa()
+
+
+def detect_dup_admission_diff_created(df):
+    """Mendeteksi admission_no duplikat dengan created_date berbeda."""
+    return duplicate_index(df).admission_diff_created()
+
+
+class HopeDuplicateIndex:
+    """Indeks duplikat HOPE: Reg. / Adm. No, Name, dan Name pada hari yang sama."""
+
+    def __init__(self, df):
+        self.df = df
+        self._tables = {}
+        _, _, adm_sizes = _group_codes(df[HOPE_ADMISSION_COL], dropna=False)
+        name_codes, n_names, name_sizes = _group_codes(df[HOPE_NAME_COL], dropna=False)
+        self.dup_admission_mask = adm_sizes > 1
+        self.dup_name_mask = name_sizes > 1
+
+        # Grup (hari, Name) dengan kunci hari integer; tanggal atau nama kosong tidak ikut
+        keys, valid = day_keys(df[HOPE_DATE_COL])
+        valid &= df[HOPE_NAME_COL].notna().to_numpy()
+        self.same_day_mask = np.zeros(len(df), dtype=bool)
+        if valid.any():
+            pair = (keys[valid] - keys[valid].min()) * n_names + name_codes[valid]
+            _, pair_codes, pair_sizes = np.unique(pair, return_inverse=True, return_counts=True)
+            self.same_day_mask[valid] = pair_sizes[pair_codes] > 1
+
+    def _table(self, name, mask):
+        if name not in self._tables:
+            self._tables[name] = self.df[mask]
+        return self._tables[name]
+
+    def dup_admission(self):
+        """Baris dengan Reg. / Adm. No yang muncul lebih dari sekali."""
+        return self._table("admission", self.dup_admission_mask)
+
+    def dup_name(self):
+        """Baris dengan Name yang muncul lebih dari sekali."""
+        return self._table("name", self.dup_name_mask)
+
+    def dup_same_day(self):
+        """Baris pasien dengan Name yang sama pada hari registrasi yang sama."""
+        return self._table("same_day", self.same_day_mask)
+
+
+def hope_duplicate_index(df):
+    """Mengambil HopeDuplicateIndex untuk DataFrame (di-memo selama objeknya tidak berubah)."""
+    return frame_memo.get(df, "hope_duplicate_index", HopeDuplicateIndex)
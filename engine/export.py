@@ -0,0 +1,148 @@
+"""Pembuatan file unduhan hasil olahan EMR dan HOPE (Excel, CSV.gz, Parquet).
+
+Sheet Excel ditulis secara streaming dengan workbook write-only openpyxl:
+baris dikonversi dan ditulis per blok sehingga memori tidak bergantung pada
+jumlah sel. Data besar juga dapat diunduh sebagai CSV.gz atau Parquet yang
+jauh lebih cepat dibuat.
+"""
+from io import BytesIO
+
+import pandas as pd
+
+from engine.summary import percentage_per_day, percentage_total
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_GZ_MIME = "application/gzip"
+PARQUET_MIME = "application/vnd.apache.parquet"
+
+# Batas baris data satu sheet Excel (di luar baris header)
+EXCEL_MAX_ROWS = 1_048_575
+CHUNK_ROWS = 50_000
+
+# format -> (label, MIME, ekstensi file)
+EXPORT_FORMATS = {
+    "xlsx": ("Excel (.xlsx)", XLSX_MIME, ".xlsx"),
+    "csv.gz": ("CSV terkompresi (.csv.gz)", CSV_GZ_MIME, ".csv.gz"),
+    "parquet": ("Parquet (.parquet)", PARQUET_MIME, ".parquet"),
+}
+
+
+def _header_cell(ws, value):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    cell = WriteOnlyCell(ws, value=value)
+    # Gaya header mengikuti DataFrame.to_excel
+    thin = Side(style="thin")
+    cell.font = Font(bold=True)
+    cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    cell.alignment = Alignment(horizontal="center", vertical="top")
+    return cell
+
+
+def _cell_values(values):
+    """Nilai kolom sebagai objek Python untuk openpyxl; nilai kosong menjadi None."""
+    series = pd.Series(values)
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _write_sheet(wb, sheet_name, df, index, on_chunk=None):
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"Sheet '{sheet_name}' berisi {len(df)} baris, melebihi batas Excel "
+                         f"{EXCEL_MAX_ROWS} baris. Gunakan format CSV.gz atau Parquet.")
+    ws = wb.create_sheet(title=sheet_name)
+    header = ([df.index.name or ""] if index else []) + [str(c) for c in df.columns]
+    ws.append([_header_cell(ws, name) for name in header])
+    for start in range(0, len(df), CHUNK_ROWS):
+        block = df.iloc[start:start + CHUNK_ROWS]
+        columns = [_cell_values(block.index)] if index else []
+        columns += [_cell_values(block.iloc[:, i]) for i in range(block.shape[1])]
+        for row in zip(*columns):
+            ws.append(row)
+        if on_chunk is not None:
+            on_chunk(len(block))
+
+
+def excel_bytes(sheets, progress=None):
+    """Menulis beberapa sheet ``[(nama, df, index), ...]`` ke satu workbook secara streaming.
+
+    ``progress(baris_ditulis, total_baris)`` dipanggil setiap satu blok baris selesai ditulis.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    total = sum(len(df) for _, df, _ in sheets)
+    written = 0
+
+    def on_chunk(rows):
+        nonlocal written
+        written += rows
+        progress(written, total)
+
+    try:
+        for sheet_name, df, index in sheets:
+            _write_sheet(wb, sheet_name, df, index, on_chunk if progress is not None else None)
+    except BaseException:
+        # Penulisan dihentikan (mis. dibatalkan lewat progress): tutup file sementara sheet
+        for ws in wb.worksheets:
+            ws.close()
+        raise
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def frame_excel_bytes(df, sheet_name="Sheet1", index=False):
+    """Membuat workbook satu sheet dari sebuah DataFrame."""
+    return excel_bytes([(sheet_name, df, index)])
+
+
+def csv_gz_bytes(df, index=False):
+    """Membuat file CSV terkompresi gzip."""
+    output = BytesIO()
+    df.to_csv(output, index=index, compression={"method": "gzip", "compresslevel": 5})
+    return output.getvalue()
+
+
+def parquet_bytes(df, index=False):
+    """Membuat file Parquet; kolom teks campuran disimpan sebagai string."""
+    output = BytesIO()
+    try:
+        df.to_parquet(output, index=index)
+    except Exception:
+        # Kolom campuran (mis. angka dan teks) tidak didukung Arrow
+        mixed = {col: df[col].astype(str).where(df[col].notna(), None) for col in df.columns if df[col].dtype == object}
+        output = BytesIO()
+        df.assign(**mixed).to_parquet(output, index=index)
+    return output.getvalue()
+
+
+def export_bytes(df, fmt="xlsx", sheet_name="Sheet1", index=False):
+    """Membuat file unduhan satu DataFrame dalam format ``fmt`` (lihat EXPORT_FORMATS)."""
+    if fmt == "xlsx":
+        return frame_excel_bytes(df, sheet_name, index)
+    if fmt == "csv.gz":
+        return csv_gz_bytes(df, index)
+    if fmt == "parquet":
+        return parquet_bytes(df, index)
+    raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+
+
+def emr_excel_bytes(df_cleaned, summary, progress=None):
+    """Membuat workbook hasil utama EMR (data bersih, summary, dan persentase).
+
+    Bila ``df_cleaned`` None, sheet Cleaned_Data tidak disertakan (data bersih
+    diunduh terpisah dalam format lain).
+    """
+    sheets = [] if df_cleaned is None else [("Cleaned_Data", df_cleaned, False)]
+    sheets += [
+        ("Summary", summary, True),
+        ("Persentase_Per_Hari", percentage_per_day(summary), True),
+        ("Persentase_Keseluruhan", percentage_total(summary), True),
+    ]
+    return excel_bytes(sheets, progress)
+
+
+def hope_excel_bytes(adoption_table):
+    """Membuat workbook tabel adopsi pasien HOPE."""
+    return frame_excel_bytes(adoption_table, "Adopsi")
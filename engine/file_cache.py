@@ -0,0 +1,157 @@
+"""Cache disk berbasis hash konten untuk file CSV/XLSX yang diunggah.
+
+Setiap file disimpan dalam satu direktori bernama hash SHA-256 dari isinya.
+Setiap sheet yang sudah di-parse disimpan sebagai Parquet (fallback ke pickle
+bila tipe kolom tidak didukung Arrow). Ukuran total dibatasi dan entri yang
+paling lama tidak dipakai dihapus lebih dulu (LRU).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ed_dashboard")
+DEFAULT_MAX_MB = 1024
+META_FILE = "meta.json"
+
+
+def content_hash(data):
+    """Menghitung hash SHA-256 dari isi file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _dir_size(path):
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+
+class FileCache:
+    """Cache sheet hasil parsing di disk dengan batas ukuran dan eviksi LRU."""
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get("ED_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("ED_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _read_meta(self, key):
+        try:
+            with open(os.path.join(self._entry_dir(key), META_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key, meta):
+        entry = self._entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=entry, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(entry, META_FILE))
+
+    def _touch(self, key):
+        try:
+            os.utime(self._entry_dir(key))
+        except OSError:
+            pass
+
+    def sheet_names(self, key):
+        """Mengembalikan daftar nama sheet yang tercatat untuk file, atau None."""
+        meta = self._read_meta(key)
+        if meta is None or meta.get("sheet_names") is None:
+            return None
+        self._touch(key)
+        return meta["sheet_names"]
+
+    def set_sheet_names(self, key, sheet_names):
+        """Mencatat daftar nama sheet sebuah file."""
+        with self._lock:
+            meta = self._read_meta(key) or {"files": {}}
+            meta["sheet_names"] = list(sheet_names)
+            self._write_meta(key, meta)
+
+    def get_sheet(self, key, sheet_name):
+        """Membaca satu sheet dari cache; None bila belum tersimpan."""
+        meta = self._read_meta(key)
+        if meta is None or sheet_name not in meta.get("files", {}):
+            return None
+        path = os.path.join(self._entry_dir(key), meta["files"][sheet_name])
+        try:
+            if path.endswith(".parquet"):
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+        except Exception:
+            return None
+        self._touch(key)
+        return df
+
+    def put_sheet(self, key, sheet_name, df):
+        """Menyimpan satu sheet ke cache lalu menjalankan eviksi bila perlu."""
+        entry = self._entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        stem = hashlib.sha1(str(sheet_name).encode("utf-8")).hexdigest()[:16]
+        fd, tmp = tempfile.mkstemp(dir=entry, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp)
+            filename = f"{stem}.parquet"
+        except Exception:
+            # Kolom campuran (mis. angka dan teks) tidak didukung Arrow
+            df.to_pickle(tmp)
+            filename = f"{stem}.pkl"
+        os.replace(tmp, os.path.join(entry, filename))
+        with self._lock:
+            meta = self._read_meta(key) or {"files": {}, "sheet_names": None}
+            meta["files"][sheet_name] = filename
+            self._write_meta(key, meta)
+        self._touch(key)
+        self.evict()
+
+    def size_bytes(self):
+        """Menghitung total ukuran cache di disk."""
+        return sum(_dir_size(e.path) for e in os.scandir(self.root) if e.is_dir())
+
+    def evict(self):
+        """Menghapus entri yang paling lama tidak dipakai hingga ukuran di bawah batas."""
+        with self._lock:
+            entries = []
+            for e in os.scandir(self.root):
+                if e.is_dir():
+                    entries.append((e.stat().st_mtime, _dir_size(e.path), e.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        """Mengosongkan seluruh cache."""
+        with self._lock:
+            for e in os.scandir(self.root):
+                if e.is_dir():
+                    shutil.rmtree(e.path, ignore_errors=True)
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Mengembalikan cache bersama proses (lokasi & batas dari ED_CACHE_DIR / ED_CACHE_MAX_MB)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FileCache()
+    return _default_cache
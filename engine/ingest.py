@@ -0,0 +1,305 @@
+"""Membaca file CSV/XLSX yang diunggah melalui cache disk berbasis hash konten."""
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from engine.dtypes import optimize_dtypes
+from engine.file_cache import content_hash, get_default_cache
+
+CSV_SHEET = "Sheet1"
+# Jarak antar titik pembatalan (``check``) saat sheet dibaca per baris/chunk
+CHECK_ROWS = 50_000
+
+
+def _is_csv(filename):
+    return filename.lower().endswith("csv")
+
+
+def _read_bytes(source):
+    """Mengambil isi file dari objek upload Streamlit, file-like, path, atau bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _parse_sheet_names(data, filename):
+    if _is_csv(filename):
+        return [CSV_SHEET]
+    return pd.ExcelFile(BytesIO(data)).sheet_names
+
+
+def _coerce_dates(df, date_columns, check=None):
+    for col in date_columns or []:
+        if col in df.columns:
+            if check is not None:
+                check()
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def _read_csv(data, check=None, **kwargs):
+    """``pd.read_csv``; bila ``check`` diisi, file dibaca per CHECK_ROWS baris dengan ``check()`` di antaranya."""
+    if check is None:
+        return pd.read_csv(BytesIO(data), **kwargs)
+    parts = []
+    with pd.read_csv(BytesIO(data), chunksize=CHECK_ROWS, **kwargs) as reader:
+        for chunk in reader:
+            check()
+            parts.append(chunk)
+    check()
+    return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+
+def _read_csv_columns(data, columns, date_columns, check=None):
+    """Membaca CSV hanya untuk kolom yang dibutuhkan."""
+    wanted = set(columns)
+    df = _read_csv(data, check, usecols=lambda c: c in wanted)
+    return _coerce_dates(df, date_columns, check)
+
+
+def _read_excel_columns(data, sheet_name, columns, date_columns, check=None):
+    """Membaca sheet Excel secara streaming (openpyxl read-only) hanya untuk kolom yang dibutuhkan."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        positions = {}
+        for i, name in enumerate(header):
+            if name in columns and name not in positions:
+                positions[name] = i
+        names = [c for c in columns if c in positions]
+        if not names:
+            return pd.DataFrame()
+        idx = [positions[c] for c in names]
+        width = max(idx) + 1
+        getter = itemgetter(*idx)
+        values = []
+        last_filled = 0
+        for row in rows:
+            if check is not None and len(values) % CHECK_ROWS == 0:
+                check()
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values.append(getter(row) if len(idx) > 1 else (getter(row),))
+            # Baris kosong di akhir sheet dibuang seperti pada pd.read_excel
+            if any(v is not None for v in row):
+                last_filled = len(values)
+    finally:
+        wb.close()
+    del values[last_filled:]
+    df = pd.DataFrame.from_records(values, columns=names)
+    # Sel kosong dijadikan NaN seperti hasil pd.read_excel
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return _coerce_dates(df, date_columns, check)
+
+
+def _parse_sheet(data, filename, sheet_name, columns=None, date_columns=None, check=None):
+    """Mem-parse satu sheet; bila ``columns`` diisi hanya kolom tersebut yang dibaca.
+
+    ``check`` dipanggil berkala sebagai titik pembatalan. ``pd.read_excel`` untuk
+    sheet utuh tidak dapat disela, sehingga hanya dicek sebelum dan sesudahnya.
+    """
+    if columns is not None:
+        if _is_csv(filename):
+            return _read_csv_columns(data, columns, date_columns, check)
+        return _read_excel_columns(data, sheet_name, columns, date_columns, check)
+    if _is_csv(filename):
+        return _read_csv(data, check)
+    if check is not None:
+        check()
+    return pd.read_excel(BytesIO(data), sheet_name=sheet_name)
+
+
+def _cache_name(sheet_name, columns, date_columns):
+    """Nama entri cache; hasil proyeksi kolom disimpan terpisah dari sheet utuh."""
+    if columns is None:
+        return sheet_name
+    spec = repr((list(columns), list(date_columns or [])))
+    return f"{sheet_name}::{hashlib.sha1(spec.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _open(source, filename, cache):
+    """Menyiapkan isi file, kunci hash, dan daftar nama sheet (dari cache bila ada)."""
+    filename = filename or getattr(source, "name", None) or str(source)
+    data = _read_bytes(source)
+    cache = cache or get_default_cache()
+    key = content_hash(data)
+    names = cache.sheet_names(key)
+    if names is None:
+        names = _parse_sheet_names(data, filename)
+        cache.set_sheet_names(key, names)
+    return data, filename, cache, key, names
+
+
+def _load(data, filename, cache, key, sheet_name, columns=None, date_columns=None, optimize=False):
+    name = _cache_name(sheet_name, columns, date_columns)
+    df = cache.get_sheet(key, name)
+    if df is None:
+        df = _parse_sheet(data, filename, sheet_name, columns, date_columns)
+        cache.put_sheet(key, name, df)
+    # Cache disk menyimpan hasil parse apa adanya; tipe ringkas diterapkan setelah dimuat
+    return optimize_dtypes(df)[0] if optimize else df
+
+
+def load_sheets(source, filename=None, sheet_names=None, cache=None, columns=None, date_columns=None,
+                optimize=False):
+    """Memuat sheet dari file; sheet yang sudah pernah di-parse diambil dari cache disk.
+
+    Bila ``sheet_names`` None, seluruh sheet dimuat. Bila ``columns`` diisi, hanya
+    kolom tersebut yang dibaca dan ``date_columns`` langsung dikonversi ke datetime.
+    Bila ``optimize`` True, tipe kolom diringkas dengan ``optimize_dtypes``.
+    """
+    data, filename, cache, key, names = _open(source, filename, cache)
+    wanted = names if sheet_names is None else list(sheet_names)
+    return {name: _load(data, filename, cache, key, name, columns, date_columns, optimize) for name in wanted}
+
+
+def load_first_sheet(source, filename=None, cache=None, columns=None, date_columns=None, optimize=False):
+    """Memuat sheet pertama saja (setara ``pd.read_excel(file)``)."""
+    data, filename, cache, key, names = _open(source, filename, cache)
+    return _load(data, filename, cache, key, names[0], columns, date_columns, optimize)
+
+
+def _parse_sheet_timed(data, filename, sheet_name, columns=None, date_columns=None):
+    """Worker process pool: mem-parse satu sheet dan mengukur waktunya."""
+    start = time.perf_counter()
+    df = _parse_sheet(data, filename, sheet_name, columns, date_columns)
+    return sheet_name, df, time.perf_counter() - start
+
+
+class LazyWorkbook(Mapping):
+    """Workbook yang daftar sheet-nya langsung tersedia; sheet di-parse saat pertama diakses.
+
+    ``parse_times`` mencatat lama pemuatan tiap sheet (detik) dan ``from_cache``
+    menandai sheet yang diambil dari cache disk. Bila ``columns`` diisi, setiap
+    sheet hanya dibaca untuk kolom tersebut. Bila ``optimize`` True, tipe kolom
+    diringkas setelah dimuat dan laporannya disimpan di ``dtype_reports``.
+
+    Isi file dan daftar sheet tidak pernah berubah setelah dibuka; sheet yang
+    dimuat disimpan per objek. ``view()`` memberi setiap session workbook
+    sendiri di atas isi file yang sama, sehingga ``release`` di satu session
+    tidak melepas sheet session lain. Parse dan release dijaga satu lock.
+    """
+
+    def __init__(self, source, filename=None, cache=None, columns=None, date_columns=None, optimize=False):
+        self._data, self.filename, self._cache, self.key, names = _open(source, filename, cache)
+        self.columns = columns
+        self.date_columns = date_columns
+        self.optimize = optimize
+        self.sheet_names = list(names)
+        self._frames = {}
+        self.parse_times = {}
+        self.from_cache = {}
+        self.dtype_reports = {}
+        self._lock = threading.RLock()
+
+    @property
+    def spec(self):
+        """Identitas isi file dan opsi baca; dua view dengan spec sama membaca data yang sama."""
+        return self.key, tuple(self.columns or ()), tuple(self.date_columns or ()), self.optimize
+
+    def view(self):
+        """Workbook baru di atas isi file yang sama tanpa sheet yang sudah dimuat."""
+        other = copy.copy(self)
+        other._frames, other.parse_times, other.from_cache, other.dtype_reports = {}, {}, {}, {}
+        other._lock = threading.RLock()
+        return other
+
+    def _store(self, sheet_name, df):
+        if self.optimize:
+            df, self.dtype_reports[sheet_name] = optimize_dtypes(df)
+        self._frames[sheet_name] = df
+
+    def __getitem__(self, sheet_name):
+        return self.load(sheet_name)
+
+    def load(self, sheet_name, check=None):
+        """Sheet ``sheet_name``; ``check`` dipanggil berkala saat sheet di-parse (titik pembatalan job)."""
+        with self._lock:
+            if sheet_name not in self._frames:
+                if sheet_name not in self.sheet_names:
+                    raise KeyError(sheet_name)
+                start = time.perf_counter()
+                name = _cache_name(sheet_name, self.columns, self.date_columns)
+                df = self._cache.get_sheet(self.key, name)
+                self.from_cache[sheet_name] = df is not None
+                if df is None:
+                    df = _parse_sheet(self._data, self.filename, sheet_name, self.columns, self.date_columns,
+                                      check)
+                    self._cache.put_sheet(self.key, name, df)
+                self._store(sheet_name, df)
+                self.parse_times[sheet_name] = time.perf_counter() - start
+            return self._frames[sheet_name]
+
+    def __iter__(self):
+        return iter(self.sheet_names)
+
+    def __len__(self):
+        return len(self.sheet_names)
+
+    def is_loaded(self, sheet_name):
+        """Mengecek apakah sheet sudah ada di memori."""
+        return sheet_name in self._frames
+
+    def release(self, sheet_name):
+        """Melepas sheet dari memori; akses berikutnya membacanya lagi dari cache disk."""
+        with self._lock:
+            self._frames.pop(sheet_name, None)
+
+    def load_all(self, parallel=False, max_workers=None):
+        """Memuat seluruh sheet; bila ``parallel`` True, sheet yang belum ada di cache di-parse lintas core."""
+        with self._lock:
+            return self._load_all(parallel, max_workers)
+
+    def _load_all(self, parallel, max_workers):
+        pending = []
+        for name in self.sheet_names:
+            if name in self._frames:
+                continue
+            start = time.perf_counter()
+            df = self._cache.get_sheet(self.key, _cache_name(name, self.columns, self.date_columns))
+            if df is None:
+                pending.append(name)
+                continue
+            self._store(name, df)
+            self.parse_times[name] = time.perf_counter() - start
+            self.from_cache[name] = True
+        if not pending:
+            return self.parse_times
+        if not parallel or len(pending) == 1:
+            for name in pending:
+                self[name]
+            return self.parse_times
+        workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_parse_sheet_timed, self._data, self.filename, name,
+                                   self.columns, self.date_columns) for name in pending]
+            for future in futures:
+                name, df, seconds = future.result()
+                self._cache.put_sheet(self.key, _cache_name(name, self.columns, self.date_columns), df)
+                self._store(name, df)
+                self.parse_times[name] = seconds
+                self.from_cache[name] = False
+        return self.parse_times
+
+
+def open_workbook(source, filename=None, cache=None, columns=None, date_columns=None, optimize=False):
+    """Membuka file sebagai LazyWorkbook tanpa mem-parse isi sheet."""
+    return LazyWorkbook(source, filename, cache, columns, date_columns, optimize)
@@ -0,0 +1,238 @@
+"""Eksekusi tahap berat (parse, pembersihan, summary, ekspor) di thread latar.
+
+Job diidentifikasi oleh nama tahap dan sidik masukannya. Rerun yang meminta
+job yang sama selagi masih berjalan mendapatkan objek job yang sama, bukan job
+baru, dan hasil job yang sudah selesai disimpan (LRU) sehingga permintaan
+berikutnya langsung selesai. Hasil job juga disimpan di ResultCache bersama
+proses sehingga session lain dengan masukan sama tidak menjalankannya lagi.
+Fungsi job menerima objek ``Job`` sebagai
+argumen pertama untuk melaporkan progres; pembatalan bersifat kooperatif:
+``Job.report``/``Job.check`` melempar JobCancelled setelah ``cancel``, dan
+tahap berat menerima ``job.check`` sebagai callback titik pembatalan di antara
+chunk. Hasil job yang dibatalkan tidak pernah disimpan atau masuk cache.
+
+Job yang sama dapat ditunggu beberapa session sekaligus. Setiap session
+mendaftar sebagai pelanggan (``subscriber``) saat submit; ``cancel`` dari satu
+pelanggan hanya melepas pelanggan tersebut, dan job baru dihentikan bila tidak
+ada pelanggan lain yang menunggu. Job selesai yang hasilnya belum diambil
+pelanggannya (``collect``) tidak dibuang dari daftar job sebelum JOB_TTL detik.
+
+Thread dipakai (bukan proses) agar DataFrame hasil tidak perlu di-pickle
+ulang ke script; operasi pandas/numpy yang berat melepas GIL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from engine.result_cache import MISSING, get_result_cache
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+DEFAULT_WORKERS = 2
+MAX_RESULTS = 16
+# Batas umur job selesai yang hasilnya belum diambil (mis. session sudah ditutup)
+JOB_TTL = 3600
+
+
+class JobCancelled(Exception):
+    """Dilempar di dalam fungsi job saat job dibatalkan."""
+
+
+class Job:
+    """Satu eksekusi tahap di latar: status, progres (0..1), pesan, hasil atau error."""
+
+    def __init__(self, key, label):
+        self.key = key
+        self.label = label
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self):
+        """True bila job sudah diminta berhenti (meskipun fungsi job belum mencapai titik pembatalan)."""
+        return self._cancel.is_set()
+
+    @property
+    def collected(self):
+        """True bila tidak ada pelanggan yang masih menunggu hasil job."""
+        return not self._subscribers
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started
+
+    def check(self):
+        """Melempar JobCancelled bila job sudah diminta berhenti."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, progress, message=None):
+        """Memperbarui progres dari dalam fungsi job (sekaligus titik pembatalan)."""
+        self.check()
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def subscribe(self, subscriber):
+        """Mendaftarkan ``subscriber`` sebagai penunggu hasil job."""
+        with self._lock:
+            self._subscribers.add(subscriber)
+
+    def subscribed(self, subscriber):
+        return subscriber in self._subscribers
+
+    def release(self, subscriber):
+        """Melepas ``subscriber`` tanpa menghentikan job (mis. setelah hasilnya diambil)."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def cancel(self, subscriber=None):
+        """Meminta job berhenti; job yang belum mulai langsung dibatalkan.
+
+        Dengan ``subscriber``, hanya pelanggan tersebut yang dilepas; job baru
+        dihentikan bila tidak ada pelanggan lain. Mengembalikan True bila job dihentikan.
+        """
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if subscriber is not None and self._subscribers:
+                return False
+            self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.status = CANCELLED
+        return True
+
+
+class JobRunner:
+    """Pool thread untuk job latar dengan dedup per (tahap, sidik) dan cache hasil LRU.
+
+    Jumlah worker diambil dari ``max_workers`` atau variabel lingkungan
+    ED_JOB_WORKERS (default 2). Bila ``cache`` (ResultCache) diisi, hasil job
+    diambil dari dan disimpan ke cache tersebut.
+    """
+
+    def __init__(self, max_workers=None, max_results=MAX_RESULTS, cache=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get("ED_JOB_WORKERS", DEFAULT_WORKERS))
+        self.max_results = max_results
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ed-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, stage, key, func, *args, label=None, cache=True, subscriber=None, **kwargs):
+        """Menjalankan ``func(job, *args, **kwargs)`` di latar, atau mengembalikan job yang sama yang sudah ada.
+
+        Hasil yang sudah ada di cache menghasilkan job yang langsung selesai.
+        Job yang gagal atau dibatalkan (termasuk yang sedang berhenti) dijalankan
+        ulang pada permintaan berikutnya. ``subscriber`` didaftarkan sebagai
+        penunggu hasil job sampai ``collect`` dipanggil.
+        """
+        job_key = (stage, key)
+        cache = self.cache if cache else None
+        with self._lock:
+            job = self._jobs.get(job_key)
+            reuse = job is not None and job.status not in (FAILED, CANCELLED) and not job.cancelled
+            # Hasil job selesai dipakai ulang selama masih ada di cache (juga dicatat sebagai hit)
+            if reuse and (job.status != DONE or cache is None or cache.lookup(stage, key) is not MISSING):
+                self._jobs.move_to_end(job_key)
+            else:
+                job = Job(job_key, label or stage)
+                self._jobs[job_key] = job
+                cached = cache.lookup(stage, key) if cache is not None else MISSING
+                if cached is not MISSING:
+                    job.result, job.progress, job.status, job.message = cached, 1.0, DONE, "diambil dari cache"
+                    job.started = job.finished_at = time.perf_counter()
+                else:
+                    job.future = self._executor.submit(self._run, job, func, args, kwargs, cache)
+            if subscriber is not None:
+                job.subscribe(subscriber)
+            self._evict()
+        return job
+
+    def get(self, job_key):
+        """Job untuk kunci ``(tahap, sidik)``; None bila tidak ada (atau sudah dibuang dari cache)."""
+        with self._lock:
+            return self._jobs.get(tuple(job_key))
+
+    def collect(self, job_key, subscriber):
+        """Menandai hasil job sudah diambil ``subscriber``; job boleh dibuang setelah semua pelanggan mengambilnya."""
+        job = self.get(job_key)
+        if job is not None:
+            job.release(subscriber)
+
+    def discard(self, job_key):
+        """Membuang job selesai yang hasilnya sudah diambil semua pelanggan (mis. setelah disimpan di tempat lain)."""
+        with self._lock:
+            job = self._jobs.get(tuple(job_key))
+            if job is not None and job.finished and job.collected:
+                del self._jobs[tuple(job_key)]
+
+    def _run(self, job, func, args, kwargs, cache):
+        job.started = time.perf_counter()
+        job.status = RUNNING
+        try:
+            job.check()
+            result = func(job, *args, **kwargs)
+            # Pembatalan yang datang saat tahap terakhir berjalan: hasil tidak disimpan maupun di-cache
+            job.check()
+            job.result = result
+            if cache is not None:
+                cache.put(*job.key, result)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as exc:
+            job.error = exc
+            job.status = FAILED
+        finally:
+            job.finished_at = time.perf_counter()
+
+    def _evict(self):
+        # Job yang hasilnya belum diambil dipertahankan, kecuali sudah melewati JOB_TTL
+        expired = time.perf_counter() - JOB_TTL
+        finished = [key for key, job in self._jobs.items()
+                    if job.finished and (job.collected or (job.finished_at or 0) < expired)]
+        for key in finished[:max(0, len(finished) - self.max_results)]:
+            del self._jobs[key]
+
+    def shutdown(self):
+        """Membatalkan semua job dan menghentikan pool."""
+        for job in list(self._jobs.values()):
+            job.cancel()
+        self._executor.shutdown(wait=False)
+
+
+_default_runner = None
+_default_lock = threading.Lock()
+
+
+def get_default_runner():
+    """Mengembalikan JobRunner bersama proses; job dengan sidik sama dipakai bersama antar session."""
+    global _default_runner
+    if _default_runner is None:
+        with _default_lock:
+            if _default_runner is None:
+                _default_runner = JobRunner(cache=get_result_cache())
+    return _default_runner
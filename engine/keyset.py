@@ -0,0 +1,86 @@
+"""Himpunan kunci baris yang ringkas untuk deduplikasi bertahap.
+
+Kunci (admission_no, created_date) di-hash menjadi uint64 dan disimpan dalam
+beberapa array terurut (8 byte per kunci). Array kecil digabung ke array yang
+lebih besar secara bertahap sehingga penambahan dan pencarian tetap murah.
+"""
+import numpy as np
+import pandas as pd
+
+
+def datetime_key(dates):
+    """Mengubah kolom tanggal menjadi int64 nanodetik (NaT tetap bernilai sama)."""
+    dates = pd.to_datetime(dates, errors="coerce")
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def row_key_hashes(df, key_columns=("admission_no", "created_date")):
+    """Menghitung hash uint64 per baris dari kolom kunci."""
+    keys = {}
+    for col in key_columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            keys[col] = datetime_key(df[col])
+        else:
+            keys[col] = df[col].astype(object).where(df[col].notna(), None)
+    frame = pd.DataFrame(keys, index=df.index)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+class KeySet:
+    """Himpunan hash uint64 yang ringkas dengan penggabungan array terurut."""
+
+    def __init__(self, hashes=None):
+        self._runs = []
+        if hashes is not None and len(hashes):
+            self._runs.append(np.unique(np.asarray(hashes, dtype=np.uint64)))
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    @property
+    def nbytes(self):
+        return sum(run.nbytes for run in self._runs)
+
+    def contains(self, hashes):
+        """Mengembalikan mask boolean untuk hash yang sudah ada di himpunan."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        """Menambahkan hash ke himpunan."""
+        run = np.unique(np.asarray(hashes, dtype=np.uint64))
+        if not len(run):
+            return
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            self._runs[-1] = np.union1d(self._runs[-1], last)
+
+    def first_seen(self, hashes):
+        """Menandai baris yang kuncinya belum pernah muncul (kemunculan pertama saja) lalu mencatatnya."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        mask = np.zeros(len(hashes), dtype=bool)
+        if not len(hashes):
+            return mask
+        _, first_idx = np.unique(hashes, return_index=True)
+        mask[first_idx] = True
+        mask &= ~self.contains(hashes)
+        self.add(hashes[mask])
+        return mask
+
+    def to_array(self):
+        """Menggabungkan seluruh isi menjadi satu array terurut."""
+        if not self._runs:
+            return np.empty(0, dtype=np.uint64)
+        merged = self._runs[0]
+        for run in self._runs[1:]:
+            merged = np.union1d(merged, run)
+        self._runs = [merged]
+        return merged
@@ -0,0 +1,62 @@
+"""Memo hasil turunan per objek DataFrame agar tidak dihitung ulang di setiap rerun."""
+import threading
+
+MEMO_ATTR = "_ed_frame_memo"
+
+
+def frame_signature(df):
+    """Sidik ringan DataFrame: bentuk dan nama kolom."""
+    return df.shape, tuple(df.columns)
+
+
+class FrameMemo:
+    """Menyimpan hasil ``factory(df)`` per nama pada objek DataFrame itu sendiri.
+
+    Hasil turunan (indeks duplikat, kubus rollup, ...) biasanya menyimpan
+    referensi ke DataFrame-nya, sehingga memo tidak boleh menahan hasil di
+    luar frame: entri disimpan sebagai atribut frame dan ikut dilepas saat
+    frame tidak lagi dipakai session mana pun. Setiap frame menyimpan paling
+    banyak ``maxsize`` nama (LRU); entri dianggap valid selama sidiknya
+    (bentuk & kolom) tidak berubah.
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _entries(self, df):
+        entries = df.__dict__.get(MEMO_ATTR)
+        if entries is None or entries[0] != self._generation:
+            entries = (self._generation, {})
+            object.__setattr__(df, MEMO_ATTR, entries)
+        return entries[1]
+
+    def get(self, df, name, factory):
+        signature = frame_signature(df)
+        with self._lock:
+            entries = self._entries(df)
+            entry = entries.get(name)
+            if entry is not None and entry[0] == signature:
+                entries[name] = entries.pop(name)
+                return entry[1]
+        value = factory(df)
+        self.put(df, name, value)
+        return value
+
+    def put(self, df, name, value):
+        """Menyimpan hasil turunan yang sudah diketahui untuk ``df`` (mis. dibangun secara bertahap)."""
+        with self._lock:
+            entries = self._entries(df)
+            entries.pop(name, None)
+            entries[name] = (frame_signature(df), value)
+            while len(entries) > self.maxsize:
+                del entries[next(iter(entries))]
+
+    def clear(self):
+        """Membuang semua entri (entri lama di frame diabaikan dan diganti saat frame dipakai lagi)."""
+        with self._lock:
+            self._generation += 1
+
+
+frame_memo = FrameMemo()
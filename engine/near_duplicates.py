@@ -0,0 +1,203 @@
+"""Deteksi nama pasien HOPE yang hampir sama (typo, gelar, spasi, huruf besar/kecil).
+
+Nama dinormalkan (kapital, tanpa gelar seperti Tn./Ny./An., tanpa tanda baca,
+spasi tunggal) lalu setiap baris dimasukkan ke blok (hari registrasi, kode
+fonetik token nama), satu blok per token, sehingga typo di satu token tetap
+tertangkap lewat token lainnya. Pasangan kandidat hanya dibentuk di dalam blok
+dan kemiripannya dihitung sekaligus untuk semua pasangan sebagai koefisien
+Dice atas bigram huruf (signature 256 bit per nama). Blok yang lebih besar dari
+``max_block`` (token yang sangat umum) dilewati dan dicatat di tabel blok,
+sehingga jumlah pasangan tumbuh hampir linear terhadap jumlah baris.
+"""
+from itertools import groupby
+
+import numpy as np
+import pandas as pd
+
+from engine.duplicates import HOPE_ADMISSION_COL, HOPE_DATE_COL, HOPE_NAME_COL
+from engine.memo import frame_memo
+from engine.summary import day_keys, format_day_index
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MAX_BLOCK = 200
+SCORE_CHUNK = 1_000_000
+
+TITLES = ["TN", "TUAN", "NY", "NYONYA", "NN", "NONA", "AN", "ANAK", "SDR", "SDRI", "MR", "MRS", "MS", "MISS",
+          "MSTR", "DR", "DRG", "PROF", "IR", "H", "HJ", "HAJI", "HAJJAH", "KH", "ALM"]
+BABY_TOKENS = ["BY", "BAYI"]
+TITLE_PATTERN = r"\b(?:" + "|".join(TITLES + BABY_TOKENS) + r")\b"
+BABY_PATTERN = r"\b(?:" + "|".join(BABY_TOKENS) + r")\b"
+
+# Soundex: vokal (dan H, W, Y) 0, konsonan dengan bunyi mirip mendapat digit sama
+SOUNDEX = str.maketrans("AEIOUYHWBFPVCGJKQSXZDTLMNR", "00000000111122222222334556")
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def normalize_names(names):
+    """Menormalkan nama: kapital, tanpa tanda baca dan gelar, spasi tunggal; kosong menjadi NA.
+
+    Mengembalikan ``(nama, bayi)``; ``bayi`` menandai nama dengan By./Bayi
+    (registrasi bayi tidak dipasangkan dengan nama ibunya).
+    """
+    text = pd.Series(names).astype("string").str.upper().str.replace(r"['`]", "", regex=True)
+    text = text.str.replace(r"[^A-Z0-9]+", " ", regex=True)
+    baby = text.str.contains(BABY_PATTERN, regex=True).fillna(False).to_numpy(dtype=bool)
+    text = text.str.replace(TITLE_PATTERN, " ", regex=True).str.replace(r" +", " ", regex=True).str.strip()
+    return text.mask(text == ""), baby
+
+
+def soundex(token):
+    """Kode fonetik (Soundex sederhana) satu token: huruf pertama dan tiga digit konsonan."""
+    digits = [digit for digit, _ in groupby(token.translate(SOUNDEX))]
+    return (token[:1] + "".join(d for d in digits[1:] if d != "0") + "000")[:4]
+
+
+def phonetic_codes(tokens):
+    """Kode fonetik tiap token (cukup dipanggil untuk token unik)."""
+    return pd.Series([soundex(token) for token in tokens], dtype=object)
+
+
+def bigram_signatures(names):
+    """Signature 256 bit (32 byte) himpunan bigram huruf tiap nama yang diapit spasi."""
+    padded = (" " + pd.Series(names).astype("string").fillna("") + " ").tolist()
+    signatures = np.zeros((len(padded), 32), dtype=np.uint8)
+    if not padded:
+        return signatures
+    chars = np.array(padded, dtype="S").view(np.uint8).reshape(len(padded), -1).astype(np.uint64)
+    rows, cols = np.nonzero(chars[:, 1:])
+    codes = chars[rows, cols] * np.uint64(256) + chars[rows, cols + 1]
+    # Hash multiplikatif 32 bit; 8 bit teratas menjadi posisi bit signature
+    bits = ((codes * np.uint64(2654435761)) % np.uint64(1 << 32)) >> np.uint64(24)
+    np.bitwise_or.at(signatures, (rows, (bits >> np.uint64(3)).astype(np.intp)),
+                     np.left_shift(1, bits & np.uint64(7)).astype(np.uint8))
+    return signatures
+
+
+def dice_scores(signatures, left, right):
+    """Koefisien Dice bigram untuk pasangan indeks signature ``(left[i], right[i])``."""
+    sizes = _POPCOUNT[signatures].sum(axis=1, dtype=np.int32)
+    scores = np.zeros(len(left))
+    for start in range(0, len(left), SCORE_CHUNK):
+        a, b = left[start:start + SCORE_CHUNK], right[start:start + SCORE_CHUNK]
+        shared = _POPCOUNT[signatures[a] & signatures[b]].sum(axis=1, dtype=np.int32)
+        total = sizes[a] + sizes[b]
+        scores[start:start + SCORE_CHUNK] = np.divide(2.0 * shared, total, out=np.zeros(len(a)), where=total > 0)
+    return scores
+
+
+def _sorted_unique(values):
+    """Nilai unik terurut (sort + beda tetangga; lebih cepat daripada np.unique untuk array kunci besar)."""
+    values = np.sort(values)
+    return values[np.r_[True, values[1:] != values[:-1]]] if len(values) else values
+
+
+def block_pairs(blocks, rows):
+    """Semua pasangan baris ``(kiri, kanan)`` yang berada di blok yang sama."""
+    order = np.argsort(blocks, kind="stable")
+    blocks, rows = blocks[order], rows[order]
+    if not len(blocks):
+        return rows, rows
+    starts = np.flatnonzero(np.r_[True, blocks[1:] != blocks[:-1]])
+    sizes = np.diff(np.r_[starts, len(blocks)])
+    later = np.repeat(sizes, sizes) - (np.arange(len(blocks)) - np.repeat(starts, sizes)) - 1
+    left = np.repeat(np.arange(len(blocks)), later)
+    right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(later) - later, later)
+    return rows[left], rows[right]
+
+
+class HopeNearDuplicates:
+    """Pasangan kandidat nama hampir sama per blok (hari registrasi, kode fonetik) beserta skornya.
+
+    Skor dihitung sekali; ambang kemiripan diterapkan saat tabel diminta
+    sehingga menggeser ambang tidak menghitung ulang apa pun.
+    """
+
+    def __init__(self, df, max_block=DEFAULT_MAX_BLOCK):
+        self.df = df
+        self.max_block = max_block
+        self._tables = {}
+        raw_codes, raw_names = pd.factorize(df[HOPE_NAME_COL], use_na_sentinel=True)
+        names, baby = normalize_names(raw_names)
+        days, valid = day_keys(df[HOPE_DATE_COL])
+        valid &= raw_codes >= 0
+        valid[valid] = names.notna().to_numpy()[raw_codes[valid]]
+        rows = np.flatnonzero(valid)
+
+        # Token per nama unik (CSR: urut menurut nomor nama) dan kode fonetiknya
+        tokens = names.str.split(" ").explode().dropna()
+        token_codes, phonetic = pd.factorize(tokens)
+        phonetic_ids, phonetic_keys = pd.factorize(phonetic_codes(phonetic))
+        token_keys = phonetic_ids[token_codes]
+        n_keys = max(len(phonetic_keys), 1)
+        counts = np.bincount(tokens.index.to_numpy(dtype=np.int64), minlength=len(raw_names))
+        offsets = np.cumsum(counts) - counts
+
+        # Satu entri per (baris, token); blok = (hari, kode fonetik)
+        name_ids = raw_codes[rows]
+        per_row = counts[name_ids]
+        entry_rows = np.repeat(rows, per_row)
+        entry_tokens = np.repeat(offsets[name_ids], per_row) + np.arange(len(entry_rows)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+        day_min = days[rows].min() if len(rows) else 0
+        block_ids, block_values = pd.factorize((days[entry_rows] - day_min) * n_keys + token_keys[entry_tokens])
+        # Token berulang dalam satu nama cukup satu entri per blok
+        n_blocks = max(len(block_values), 1)
+        entry = _sorted_unique(entry_rows.astype(np.int64) * n_blocks + block_ids)
+        entry_rows, block_ids = entry // n_blocks, entry % n_blocks
+
+        sizes = np.bincount(block_ids, minlength=len(block_values))
+        self.blocks = pd.DataFrame({
+            HOPE_DATE_COL: format_day_index(block_values // n_keys + day_min),
+            "Kode_Fonetik": np.asarray(phonetic_keys, dtype=object)[block_values % n_keys],
+            "Baris": sizes,
+            "Pasangan_Kandidat": sizes * (sizes - 1) // 2,
+            "Dilewati": sizes > max_block,
+        })
+        compared = (sizes[block_ids] > 1) & (sizes[block_ids] <= max_block)
+        left, right = block_pairs(block_ids[compared], entry_rows[compared])
+
+        # Pasangan yang muncul di beberapa blok (beberapa token sama) dihitung sekali
+        n_rows = max(len(df), 1)
+        pair_keys = _sorted_unique(left * n_rows + right)
+        left, right = pair_keys // n_rows, pair_keys % n_rows
+        self.candidate_pairs = len(pair_keys)
+        # Nama mentah identik sudah dilaporkan sebagai duplikat biasa; bayi tidak dipasangkan dengan non-bayi
+        keep = (raw_codes[left] != raw_codes[right]) & (baby[raw_codes[left]] == baby[raw_codes[right]])
+        self.left, self.right = left[keep], right[keep]
+        self.scores = dice_scores(bigram_signatures(names), raw_codes[self.left], raw_codes[self.right])
+
+    @property
+    def skipped_blocks(self):
+        return self.blocks[self.blocks["Dilewati"]]
+
+    def pairs(self, threshold=DEFAULT_THRESHOLD):
+        """Pasangan baris dengan kemiripan nama ≥ ``threshold``, diurutkan dari yang paling mirip."""
+        if ("pairs", threshold) not in self._tables:
+            hit = np.flatnonzero(self.scores >= threshold)
+            hit = hit[np.argsort(-self.scores[hit], kind="stable")]
+            left, right = self.left[hit], self.right[hit]
+            dates, names, admissions = self.df[HOPE_DATE_COL], self.df[HOPE_NAME_COL], self.df[HOPE_ADMISSION_COL]
+            self._tables[("pairs", threshold)] = pd.DataFrame({
+                "Name_1": names.to_numpy()[left],
+                "Name_2": names.to_numpy()[right],
+                "Kemiripan": np.round(self.scores[hit], 3),
+                f"{HOPE_DATE_COL}_1": dates.to_numpy()[left],
+                f"{HOPE_DATE_COL}_2": dates.to_numpy()[right],
+                f"{HOPE_ADMISSION_COL}_1": admissions.to_numpy()[left],
+                f"{HOPE_ADMISSION_COL}_2": admissions.to_numpy()[right],
+            })
+        return self._tables[("pairs", threshold)]
+
+    def rows(self, threshold=DEFAULT_THRESHOLD):
+        """Baris yang termasuk dalam setidaknya satu pasangan nama hampir sama."""
+        if ("rows", threshold) not in self._tables:
+            hit = self.scores >= threshold
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[self.left[hit]] = True
+            mask[self.right[hit]] = True
+            self._tables[("rows", threshold)] = self.df[mask]
+        return self._tables[("rows", threshold)]
+
+
+def hope_near_duplicates(df, max_block=DEFAULT_MAX_BLOCK):
+    """Mengambil HopeNearDuplicates untuk DataFrame (di-memo selama objeknya tidak berubah)."""
+    return frame_memo.get(df, f"hope_near_duplicates:{max_block}", lambda df: HopeNearDuplicates(df, max_block))
@@ -0,0 +1,99 @@
+"""Paginasi tabel di sisi server: filter dan pengurutan dikerjakan pandas, hanya satu halaman dikirim.
+
+Urutan per kolom, mask filter, dan jumlah baris hasil filter disimpan di
+objek PagedFrame yang di-memo per DataFrame sehingga berpindah halaman tidak
+menghitung ulang apa pun.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from engine.dtypes import is_text
+from engine.memo import frame_memo
+
+MAX_CACHED_MASKS = 32
+
+
+def text_mask(series, text):
+    """Mask baris yang mengandung ``text`` (tanpa membedakan huruf besar/kecil)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Cukup mencocokkan daftar kategori lalu memetakannya lewat kode
+        hits = series.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        codes = series.cat.codes.to_numpy()
+        return np.asarray(hits, dtype=bool)[codes] & (codes >= 0)
+    return series.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool) & series.notna().to_numpy()
+
+
+def _filter_key(filters):
+    return tuple(sorted((col, text) for col, text in (filters or {}).items() if text))
+
+
+class PagedFrame:
+    """DataFrame dengan cache urutan, filter, dan jumlah baris untuk ditampilkan per halaman."""
+
+    def __init__(self, df):
+        self.df = df
+        self.total_rows = len(df)
+        self.filter_columns = [col for col in df.columns if is_text(df[col]) or isinstance(df[col].dtype, pd.CategoricalDtype)]
+        self._orders = {}
+        self._masks = OrderedDict()
+        self._counts = {}
+
+    def order(self, column, ascending=True):
+        """Posisi baris terurut menurut ``column`` (stabil, nilai kosong di akhir)."""
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.df[column].reset_index(drop=True)
+            try:
+                ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+            except TypeError:
+                # Kolom object bercampur (mis. admission_no angka dan teks dari Excel) diurutkan sebagai teks
+                ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last",
+                                             key=lambda s: s.where(s.isna(), s.astype(str)))
+            self._orders[key] = ordered.index.to_numpy()
+        return self._orders[key]
+
+    def mask(self, filters):
+        """Mask gabungan filter ``{kolom: teks}``; None bila tidak ada filter."""
+        active = _filter_key(filters)
+        if not active:
+            return None
+        if active not in self._masks:
+            mask = np.ones(self.total_rows, dtype=bool)
+            for col, text in active:
+                mask &= text_mask(self.df[col], text)
+            self._masks[active] = mask
+            while len(self._masks) > MAX_CACHED_MASKS:
+                self._masks.popitem(last=False)
+        self._masks.move_to_end(active)
+        return self._masks[active]
+
+    def count(self, filters=None):
+        """Jumlah baris setelah filter (dihitung sekali per kombinasi filter)."""
+        mask = self.mask(filters)
+        if mask is None:
+            return self.total_rows
+        key = _filter_key(filters)
+        if key not in self._counts:
+            self._counts[key] = int(mask.sum())
+        return self._counts[key]
+
+    def page(self, page=1, page_size=50, sort_by=None, ascending=True, filters=None):
+        """Baris pada halaman ``page`` (mulai dari 1) setelah filter dan pengurutan."""
+        mask = self.mask(filters)
+        if sort_by is not None:
+            positions = self.order(sort_by, ascending)
+            if mask is not None:
+                positions = positions[mask[positions]]
+        else:
+            positions = np.flatnonzero(mask) if mask is not None else None
+        start = max(page - 1, 0) * page_size
+        if positions is None:
+            return self.df.iloc[start:start + page_size]
+        return self.df.iloc[positions[start:start + page_size]]
+
+
+def paged_frame(df):
+    """Mengambil PagedFrame untuk DataFrame (di-memo selama objeknya tidak berubah)."""
+    return frame_memo.get(df, "paged_frame", PagedFrame)
@@ -0,0 +1,127 @@
+"""Pipeline EMR dan HOPE tanpa Streamlit: load → konversi tanggal → dedupe → filter → summary → ekspor.
+
+Dipakai oleh perintah batch (``python -m engine.batch``) untuk memproses banyak
+file sekaligus dengan process pool, satu file per worker.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from engine.cleaning import clean_duplicates, convert_date_columns
+from engine.columns import EMR_COLUMNS, EMR_DATE_COLUMNS, HOPE_COLUMNS, HOPE_DATE_COLUMNS, HOPE_UNITS
+from engine.export import emr_excel_bytes, hope_excel_bytes
+from engine.ingest import load_first_sheet, load_sheets
+from engine.rollup import emr_cube, hope_adoption_table, hope_cube
+from engine.time_index import sort_by_time, time_index
+
+HOPE_DATE_COL = "Reg. / Adm. Date"
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _result(path, sheet=None, rows=0, rows_cleaned=0, output=None, error=None, started=None):
+    seconds = time.perf_counter() - started if started is not None else 0.0
+    return {
+        "file": os.path.basename(path),
+        "sheet": sheet,
+        "rows": rows,
+        "rows_cleaned": rows_cleaned,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+        "output": output,
+        "error": error,
+    }
+
+
+def clean_emr(df, remove_no_epa=False, start=None, end=None):
+    """Membersihkan satu sheet EMR dan membuat summary per hari.
+
+    Mengembalikan ``(df_cleaned, summary, msg)``; bila ``start``/``end`` diisi,
+    data bersih dan summary dibatasi pada rentang admission_date tersebut.
+    """
+    df = convert_date_columns(df, EMR_DATE_COLUMNS)
+    if "created_date" not in df.columns or "admission_date" not in df.columns:
+        raise ValueError("Kolom 'created_date' atau 'admission_date' tidak ditemukan.")
+    df_cleaned, msg = clean_duplicates(df, remove_no_epa)
+    df_cleaned = sort_by_time(df_cleaned, "admission_date")
+    if start is not None or end is not None:
+        index = time_index(df_cleaned, "admission_date")
+        df_cleaned = index.slice(start if start is not None else index.min(), end if end is not None else index.max())
+    summary = emr_cube(df_cleaned).view("day")
+    return df_cleaned, summary, msg
+
+
+def process_emr_file(path, output_dir, remove_no_epa=False, start=None, end=None, keep_all_columns=False):
+    """Memproses satu file EMR (semua sheet) dan menulis workbook hasil utama per sheet."""
+    results = []
+    started = time.perf_counter()
+    try:
+        sheets = load_sheets(path, columns=None if keep_all_columns else EMR_COLUMNS, date_columns=EMR_DATE_COLUMNS,
+                             optimize=True)
+    except Exception as e:
+        return [_result(path, error=f"Gagal membaca file: {e}", started=started)]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for sheet_name, df in sheets.items():
+        try:
+            df_cleaned, summary, _ = clean_emr(df, remove_no_epa, start, end)
+            suffix = f"_{sheet_name}" if len(sheets) > 1 else ""
+            filename = f"EMR_Adoption_{stem}{suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            output = _write(os.path.join(output_dir, filename), emr_excel_bytes(df_cleaned, summary))
+            results.append(_result(path, sheet_name, len(df), len(df_cleaned), output, started=started))
+        except Exception as e:
+            results.append(_result(path, sheet_name, len(df), error=str(e), started=started))
+        started = time.perf_counter()
+    return results
+
+
+def detect_unit(path):
+    """Menebak unit HOPE dari nama file (mis. ``SHDP_januari.xlsx`` → ``SHDP``)."""
+    name = os.path.basename(path).upper()
+    return next((unit for unit in HOPE_UNITS if unit in name), os.path.splitext(os.path.basename(path))[0])
+
+
+def clean_hope(df):
+    """Menyisakan kolom penting HOPE, mengonversi tanggal, dan membuang baris 'Cancelled'."""
+    missing_cols = [col for col in HOPE_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom berikut tidak ditemukan dalam data: {', '.join(missing_cols)}")
+    df_cleaned = df[HOPE_COLUMNS].copy()
+    df_cleaned[HOPE_DATE_COL] = pd.to_datetime(df_cleaned[HOPE_DATE_COL], errors="coerce")
+    df_cleaned = df_cleaned[df_cleaned["Status"].str.lower() != "cancelled"]
+    return sort_by_time(df_cleaned, HOPE_DATE_COL)
+
+
+def process_hope_file(path, output_dir, unit=None, start_date=None, end_date=None):
+    """Memproses satu file HOPE dan menulis workbook tabel adopsi pasien per hari."""
+    started = time.perf_counter()
+    unit = unit or detect_unit(path)
+    try:
+        df = load_first_sheet(path, columns=HOPE_COLUMNS, date_columns=HOPE_DATE_COLUMNS, optimize=True)
+        final_df = clean_hope(df)
+        adoption_table = hope_adoption_table(hope_cube(final_df), start_date, end_date)
+        if start_date is not None and end_date is not None:
+            filename = f"HOPE_{unit}_{start_date}_{end_date}.xlsx"
+        else:
+            filename = f"HOPE_{unit}_full.xlsx"
+        output = _write(os.path.join(output_dir, filename), hope_excel_bytes(adoption_table))
+        return [_result(path, unit, len(df), len(final_df), output, started=started)]
+    except Exception as e:
+        return [_result(path, unit, error=str(e), started=started)]
+
+
+def run_batch(kind, paths, output_dir, workers=None, **options):
+    """Memproses banyak file secara paralel (satu file per worker) dan mengembalikan hasil per file/sheet."""
+    os.makedirs(output_dir, exist_ok=True)
+    process = process_emr_file if kind == "emr" else process_hope_file
+    if workers == 1 or len(paths) <= 1:
+        return [r for path in paths for r in process(path, output_dir, **options)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process, path, output_dir, **options) for path in paths]
+        return [r for future in futures for r in future.result()]
@@ -0,0 +1,137 @@
+"""Profiling per tahap untuk satu rerun dashboard.
+
+Setiap panggilan tahap (parse, konversi tanggal, deteksi duplikat, summary,
+ekspor, ...) dicatat waktu, jumlah baris masuk/keluar, dan ukuran memori
+DataFrame-nya. Catatan juga ditulis sebagai baris log JSON ke logger
+``ed_dashboard.profile`` agar dapat diteruskan ke log shipper.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+
+import pandas as pd
+
+logger = logging.getLogger("ed_dashboard.profile")
+
+PROFILE_ENV = "ED_PROFILE"
+
+
+def profiling_default():
+    """Profiling aktif secara default bila variabel lingkungan ED_PROFILE=1."""
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def _ensure_handler():
+    """Menulis log profiling ke stderr (satu objek JSON per baris) bila belum ada handler."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def _first_frame(value):
+    """DataFrame pertama pada nilai (atau tuple/list) tersebut, None bila tidak ada."""
+    if isinstance(value, pd.DataFrame):
+        return value
+    if isinstance(value, (tuple, list)):
+        return next((v for v in value if isinstance(v, pd.DataFrame)), None)
+    return None
+
+
+class StageProfiler:
+    """Pencatat tahap untuk satu rerun; tanpa overhead bila ``enabled`` False.
+
+    ``on_record`` dipanggil setelah setiap tahap selesai (mis. untuk
+    memperbarui panel di sidebar), hanya dari thread yang membuat profiler;
+    tahap yang berjalan di job latar tetap dicatat dan ditulis ke log.
+    """
+
+    def __init__(self, module, enabled=True, deep_memory=False, on_record=None):
+        self.module = module
+        self.enabled = enabled
+        self.deep_memory = deep_memory
+        self.on_record = on_record
+        self.rerun_id = uuid4().hex[:8]
+        self.records = []
+        self._thread = threading.get_ident()
+        if enabled:
+            _ensure_handler()
+
+    def _memory_mb(self, df):
+        if df is None:
+            return None
+        return df.memory_usage(index=True, deep=self.deep_memory).sum() / 1e6
+
+    @contextmanager
+    def stage(self, name, df_in=None):
+        """Mencatat blok kode sebagai tahap ``name``; isi ``record["out"]`` dengan DataFrame hasil."""
+        record = {"out": None}
+        if not self.enabled:
+            yield record
+            return
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._finish(name, start, df_in, record["out"])
+
+    def wrap(self, name, func):
+        """Membungkus ``func`` agar setiap panggilannya dicatat sebagai tahap ``name``."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            df_in = _first_frame(args)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                self._finish(name, start, df_in, _first_frame(result))
+        return wrapper
+
+    def _finish(self, name, start, df_in, df_out):
+        seconds = time.perf_counter() - start
+        record = {
+            "module": self.module,
+            "rerun": self.rerun_id,
+            "stage": name,
+            "call": sum(1 for r in self.records if r["stage"] == name) + 1,
+            "seconds": round(seconds, 6),
+            "rows_in": len(df_in) if df_in is not None else None,
+            "rows_out": len(df_out) if df_out is not None else None,
+            "mem_in_mb": self._memory_mb(df_in),
+            "mem_out_mb": self._memory_mb(df_out),
+        }
+        self.records.append(record)
+        logger.info(json.dumps(record))
+        if self.on_record is not None and threading.get_ident() == self._thread:
+            self.on_record(self)
+
+    def table(self):
+        """Ringkasan per tahap untuk rerun ini: jumlah panggilan, waktu, baris, memori."""
+        columns = ["stage", "calls", "seconds", "rows_in", "rows_out", "mem_in_mb", "mem_out_mb"]
+        if not self.records:
+            return pd.DataFrame(columns=columns).set_index("stage")
+        frame = pd.DataFrame(self.records)
+        grouped = frame.groupby("stage", sort=False).agg(
+            calls=("call", "size"),
+            seconds=("seconds", "sum"),
+            rows_in=("rows_in", "max"),
+            rows_out=("rows_out", "max"),
+            mem_in_mb=("mem_in_mb", "max"),
+            mem_out_mb=("mem_out_mb", "max"),
+        )
+        return grouped.round({"seconds": 3, "mem_in_mb": 1, "mem_out_mb": 1})
+
+    @property
+    def total_seconds(self):
+        return sum(r["seconds"] for r in self.records)
@@ -0,0 +1,176 @@
+"""Rekonsiliasi EMR ↔ HOPE: registrasi HOPE mana yang memiliki catatan triage EMR.
+
+Nomor admisi kedua sumber dinormalkan lalu diindeks dalam satu tabel hash
+(``pd.factorize``) sehingga nomor yang sama mendapat kode integer yang sama;
+pencocokan cukup berupa lookup array boolean per kode, tanpa merge DataFrame.
+Hasilnya berupa persentase kecocokan per unit dan per hari serta tabel baris
+yang tidak cocok di kedua arah. Unit diproses paralel dengan process pool,
+satu unit per worker.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from engine.columns import EMR_COLUMNS, EMR_DATE_COLUMNS, HOPE_COLUMNS, HOPE_DATE_COLUMNS
+from engine.dtypes import concat_frames
+from engine.ingest import load_sheets
+from engine.pipeline import HOPE_DATE_COL, clean_hope
+from engine.summary import day_keys, format_day_index
+
+EMR_KEY_COL = "admission_no"
+HOPE_KEY_COL = "Reg. / Adm. No"
+DAILY_COLUMNS = ["HOPE_Admissions", "Matched_EMR", "Unmatched", "Match_Percentage"]
+
+
+def _normalize_text(text):
+    text = text.astype("string").str.strip().str.upper()
+    # Angka dari sel Excel terbaca sebagai float (mis. "12345.0")
+    text = text.str.replace(r"\.0+$", "", regex=True).str.replace(r"[^0-9A-Z]", "", regex=True)
+    return text.mask(text == "")
+
+
+def normalize_admission(series):
+    """Menormalkan nomor admisi: kapital, tanpa spasi/tanda baca, tanpa akhiran ".0"; kosong menjadi NA.
+
+    Kolom categorical cukup dinormalkan pada daftar kategorinya.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = _normalize_text(pd.Series(series.cat.categories)).to_numpy(dtype=object, na_value=None)
+        codes = series.cat.codes.to_numpy()
+        values = np.where(codes >= 0, categories[np.maximum(codes, 0)], None)
+        return pd.Series(values, index=series.index, dtype="string")
+    return _normalize_text(series)
+
+
+def admission_codes(*columns):
+    """Kode integer bersama untuk nomor admisi ternormalisasi beberapa kolom (-1 untuk nomor kosong).
+
+    Mengembalikan ``(kode_per_kolom, jumlah_nomor_unik)``.
+    """
+    normalized = [normalize_admission(col).reset_index(drop=True) for col in columns]
+    codes, uniques = pd.factorize(pd.concat(normalized, ignore_index=True), use_na_sentinel=True)
+    bounds = np.cumsum([0] + [len(col) for col in normalized])
+    return [codes[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])], len(uniques)
+
+
+def _present(codes, n_keys):
+    """Array boolean per kode (ditambah satu slot False untuk kode -1)."""
+    present = np.zeros(n_keys + 1, dtype=bool)
+    present[codes[codes >= 0]] = True
+    return present
+
+
+def _percentage(matched, total):
+    return np.round(np.divide(matched * 100.0, total, out=np.zeros(len(total)), where=total > 0), 1)
+
+
+def reconcile(emr, hope, unit=None):
+    """Mencocokkan registrasi HOPE (sudah tanpa 'Cancelled') dengan catatan triage EMR satu unit.
+
+    Mengembalikan dict berisi ``unit``, ``totals`` (jumlah dan persentase),
+    ``daily`` (per tanggal registrasi HOPE), ``unmatched_hope`` (registrasi
+    tanpa EMR), dan ``unmatched_emr`` (admission_no EMR tanpa registrasi HOPE,
+    satu baris per nomor).
+    """
+    for frame, col, source in ((emr, EMR_KEY_COL, "EMR"), (hope, HOPE_KEY_COL, "HOPE")):
+        if col not in frame.columns:
+            raise ValueError(f"Kolom '{col}' tidak ditemukan pada data {source}.")
+    (emr_codes, hope_codes), n_keys = admission_codes(emr[EMR_KEY_COL], hope[HOPE_KEY_COL])
+    in_emr = _present(emr_codes, n_keys)
+    in_hope = _present(hope_codes, n_keys)
+
+    # Kode -1 menunjuk slot terakhir yang selalu False
+    matched = in_emr[hope_codes]
+    emr_unmatched = (emr_codes >= 0) & ~in_hope[emr_codes]
+    # Satu baris EMR per nomor admisi yang tidak ditemukan di HOPE
+    _, first = np.unique(emr_codes[emr_unmatched], return_index=True)
+    emr_rows = np.sort(np.flatnonzero(emr_unmatched)[first])
+
+    days, dated = day_keys(hope[HOPE_DATE_COL])
+    uniq, inverse = np.unique(days[dated], return_inverse=True)
+    total = np.bincount(inverse, minlength=len(uniq))
+    hit = np.bincount(inverse, weights=matched[dated], minlength=len(uniq)).astype(np.int64)
+    daily = pd.DataFrame({
+        "HOPE_Admissions": total,
+        "Matched_EMR": hit,
+        "Unmatched": total - hit,
+        "Match_Percentage": _percentage(hit, total),
+    }, index=format_day_index(uniq).rename(HOPE_DATE_COL))
+
+    n_hope, n_matched = len(hope), int(matched.sum())
+    totals = {
+        "Unit": unit,
+        "HOPE_Admissions": n_hope,
+        "Matched_EMR": n_matched,
+        "Unmatched": n_hope - n_matched,
+        "Match_Percentage": round(n_matched * 100.0 / n_hope, 1) if n_hope else 0.0,
+        "EMR_Admissions": int(in_emr.sum()),
+        "EMR_Without_HOPE": len(emr_rows),
+    }
+    return {
+        "unit": unit,
+        "totals": totals,
+        "daily": daily,
+        "unmatched_hope": hope[~matched],
+        "unmatched_emr": emr.iloc[emr_rows],
+    }
+
+
+def _load(source, columns, date_columns):
+    """Memuat sumber satu unit: DataFrame, path, atau ``(bytes, nama_file)``; seluruh sheet digabung."""
+    if isinstance(source, pd.DataFrame):
+        return source
+    data, filename = source if isinstance(source, tuple) else (source, None)
+    sheets = load_sheets(data, filename, columns=columns, date_columns=date_columns, optimize=True)
+    return concat_frames(list(sheets.values()))
+
+
+def reconcile_unit(unit, emr_source, hope_source):
+    """Worker satu unit: memuat EMR dan HOPE, membuang registrasi 'Cancelled', lalu merekonsiliasi."""
+    started = time.perf_counter()
+    emr = _load(emr_source, EMR_COLUMNS, EMR_DATE_COLUMNS)
+    hope = clean_hope(_load(hope_source, HOPE_COLUMNS, HOPE_DATE_COLUMNS))
+    result = reconcile(emr, hope, unit)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def reconcile_units(sources, workers=None, progress=None):
+    """Merekonsiliasi banyak unit ``{unit: (sumber_emr, sumber_hope)}`` secara paralel.
+
+    ``progress(selesai, total, unit)`` dipanggil setiap satu unit selesai.
+    Mengembalikan ``(units, results)``: tabel ringkasan per unit dan dict hasil
+    ``reconcile`` per unit (urutan mengikuti ``sources``).
+    """
+    results = {}
+    if workers == 1 or len(sources) <= 1:
+        for unit, (emr_source, hope_source) in sources.items():
+            results[unit] = reconcile_unit(unit, emr_source, hope_source)
+            if progress is not None:
+                progress(len(results), len(sources), unit)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(reconcile_unit, unit, emr_source, hope_source): unit
+                       for unit, (emr_source, hope_source) in sources.items()}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    if progress is not None:
+                        progress(len(results), len(sources), futures[future])
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    results = {unit: results[unit] for unit in sources}
+    units = pd.DataFrame([r["totals"] for r in results.values()]).set_index("Unit") if results else pd.DataFrame()
+    return units, results
+
+
+def daily_by_unit(results):
+    """Tabel harian seluruh unit dalam satu DataFrame (kolom Unit di depan)."""
+    frames = [r["daily"].reset_index().assign(Unit=unit) for unit, r in results.items()]
+    if not frames:
+        return pd.DataFrame(columns=["Unit", HOPE_DATE_COL] + DAILY_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[["Unit", HOPE_DATE_COL] + DAILY_COLUMNS]
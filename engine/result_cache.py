@@ -0,0 +1,136 @@
+"""Cache hasil turunan bersama seluruh session dalam satu proses.
+
+Hasil tahap (posisi baris data bersih, summary, grafik, file unduhan, tabel
+adopsi) disimpan dengan kunci (tahap, sidik isi data + parameter pipeline),
+sehingga analis lain yang mengolah extract yang sama langsung mendapatkan
+hasilnya. Data mentah dan data bersih EMR tidak disimpan di sini: keduanya
+milik tab session (engine.session_store) agar batas memori session dapat
+benar-benar melepasnya; sheet ter-parse dipakai ulang lewat cache disk. Total
+ukuran dibatasi (ED_RESULT_CACHE_MB, default 1024 MB) dengan pelepasan LRU;
+jumlah hit, miss, dan pelepasan dicatat per tahap.
+"""
+import hashlib
+import os
+import threading
+from collections import Counter, OrderedDict
+
+import pandas as pd
+
+from engine.memo import frame_memo
+from engine.sizing import result_nbytes
+
+DEFAULT_MAX_MB = 1024
+
+MISSING = object()
+
+
+def _frame_hash(df):
+    hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    columns = "|".join(f"{col}:{dtype}" for col, dtype in df.dtypes.items())
+    return hashlib.sha1(columns.encode("utf-8") + hashes.tobytes()).hexdigest()
+
+
+def fingerprint(*parts):
+    """Sidik isi data dan parameter.
+
+    DataFrame diwakili hash isinya (di-memo per objek DataFrame), bytes dan file
+    unggahan hash kontennya, nilai lain ``repr``-nya.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            token = frame_memo.get(part, "fingerprint", _frame_hash)
+        elif isinstance(part, (bytes, bytearray, memoryview)):
+            token = hashlib.sha256(part).hexdigest()
+        elif hasattr(part, "getvalue"):
+            token = hashlib.sha256(part.getvalue()).hexdigest()
+        else:
+            token = repr(part)
+        digest.update(token.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache LRU hasil tahap dengan batas memori total dan penghitung hit/miss."""
+
+    def __init__(self, max_mb=None):
+        if max_mb is None:
+            max_mb = float(os.environ.get("ED_RESULT_CACHE_MB", DEFAULT_MAX_MB))
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.bytes = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, stage, key):
+        """Hasil tersimpan untuk ``(stage, key)``; MISSING bila tidak ada."""
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            if entry is None:
+                self.misses[stage] += 1
+                return MISSING
+            self._entries.move_to_end((stage, key))
+            self.hits[stage] += 1
+            return entry[0]
+
+    def put(self, stage, key, value):
+        """Menyimpan hasil; hasil yang lebih besar dari batas cache tidak disimpan."""
+        size = result_nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop((stage, key), None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[(stage, key)] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, stage, key, factory):
+        """Mengambil hasil tersimpan atau menghitungnya dengan ``factory()`` lalu menyimpannya."""
+        value = self.lookup(stage, key)
+        if value is MISSING:
+            value = factory()
+            self.put(stage, key, value)
+        return value
+
+    def stats(self):
+        """Ringkasan isi cache: jumlah entri, ukuran, hit/miss total dan per tahap."""
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": self.evictions,
+            "stages": {stage: (self.hits[stage], self.misses[stage]) for stage in sorted(set(self.hits) | set(self.misses))},
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Mengembalikan cache hasil bersama proses (batas dari ED_RESULT_CACHE_MB)."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = ResultCache()
+    return _default_cache
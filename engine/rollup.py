@@ -0,0 +1,201 @@
+"""Kubus rollup waktu multi-resolusi (jam, shift, hari, minggu, bulan).
+
+Seluruh metrik dihitung sekali per jam untuk setiap dataset bersih. Tampilan
+per hari, shift, minggu, dan bulan serta filter rentang waktu dijawab dengan
+mengagregasi ulang kubus tersebut, bukan memindai ulang baris mentah. Hanya
+baris di jam tepi yang tidak penuh tercakup rentang yang dibaca dari data.
+Kubus dapat diperluas dengan baris tambahan (mode append) tanpa menghitung
+ulang jam yang tidak terdampak.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from engine.memo import frame_memo
+from engine.summary import DAY_FORMAT, SUMMARY_DATE_COL, format_day_index, indicator_frame
+from engine.time_index import time_index
+
+HOUR_NS = 3600 * 10**9
+# Baris per chunk saat kubus dibangun dengan titik pembatalan (``check``)
+CHUNK_ROWS = 500_000
+
+# Shift perawat: (nama, jam mulai). Shift malam melewati tengah malam dan
+# dihitung pada tanggal shift dimulai.
+SHIFTS = [("Pagi", 7), ("Siang", 14), ("Malam", 21)]
+
+GRANULARITIES = {
+    "hour": "Per Jam",
+    "shift": "Per Shift",
+    "day": "Per Hari",
+    "week": "Per Minggu",
+    "month": "Per Bulan",
+}
+
+HOPE_COUNT_COL = "Jumlah Pasien"
+
+
+def _hour_counts(frame, date_col, counts_fn, check=None):
+    """Menjumlahkan indikator per kunci jam (jam sejak epoch) untuk baris bertanggal valid.
+
+    Bila ``check`` diisi, baris diproses per CHUNK_ROWS dan ``check()`` dipanggil di antara chunk.
+    """
+    if check is not None and len(frame) > CHUNK_ROWS:
+        parts = []
+        for start in range(0, len(frame), CHUNK_ROWS):
+            check()
+            parts.append(_hour_counts(frame.iloc[start:start + CHUNK_ROWS], date_col, counts_fn))
+        return _sum_hours([part for part in parts if len(part)] or parts[:1])
+    values = frame[date_col].to_numpy(dtype="datetime64[ns]")
+    valid = ~np.isnat(values)
+    hours = values[valid].astype("datetime64[h]").astype(np.int64)
+    counts = counts_fn(frame)[valid]
+    return counts.groupby(hours, sort=True).sum().astype(np.int64)
+
+
+def _sum_hours(parts):
+    """Menjumlahkan beberapa tabel hitungan per jam."""
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts).groupby(level=0, sort=True).sum().astype(np.int64)
+
+
+def _shift_labels(hours):
+    """Memetakan kunci jam ke (kunci hari shift, urutan shift)."""
+    starts = [start for _, start in SHIFTS]
+    hour_of_day = hours % 24
+    pos = np.searchsorted(starts, hour_of_day, side="right") - 1
+    # Jam sebelum shift pertama termasuk shift terakhir hari sebelumnya
+    day = hours // 24 - (pos < 0)
+    return day, pos % len(SHIFTS)
+
+
+class RollupCube:
+    """Hitungan metrik per jam untuk satu DataFrame, dapat diagregasi ulang ke resolusi lain."""
+
+    def __init__(self, df, date_col, counts_fn, check=None):
+        self.date_col = date_col
+        self.columns = list(counts_fn(df.iloc[:0]).columns)
+        self._counts_fn = counts_fn
+        # Satu TimeIndex per segmen data; baris jam tepi dibaca dari setiap segmen
+        self._indexes = [time_index(df, date_col)]
+        self.hourly = _hour_counts(self._indexes[0].frame, date_col, counts_fn, check)
+
+    def appended(self, df):
+        """Kubus baru yang juga mencakup baris ``df``; hanya jam yang terdampak yang dijumlahkan."""
+        index = time_index(df, self.date_col)
+        extra = _hour_counts(index.frame, self.date_col, self._counts_fn)
+        cube = copy.copy(self)
+        cube._indexes = self._indexes + [index]
+        cube.hourly = _sum_hours([self.hourly, extra]) if len(extra) else self.hourly
+        return cube
+
+    def rebased(self, df):
+        """Kubus yang sama dengan baris tepi dibaca dari ``df`` (berisi seluruh baris semua segmen)."""
+        cube = copy.copy(self)
+        cube._indexes = [time_index(df, self.date_col)]
+        return cube
+
+    def detached(self):
+        """Kubus tanpa referensi ke DataFrame (hanya hitungan per jam), untuk disimpan di cache bersama.
+
+        Pasang kembali ke data dengan ``rebased`` (atau ``attach_emr_cube``) sebelum ``view``.
+        """
+        cube = copy.copy(self)
+        cube._indexes = []
+        return cube
+
+    def window(self, start=None, end=None):
+        """Hitungan per jam untuk rentang waktu inklusif ``start``..``end`` (None berarti tanpa batas)."""
+        hours = self.hourly.index.to_numpy(dtype=np.int64)
+        if (start is None and end is None) or not len(hours):
+            return self.hourly
+        start_ns = pd.Timestamp(start).as_unit("ns").value if start is not None else int(hours[0]) * HOUR_NS
+        end_ns = pd.Timestamp(end).as_unit("ns").value if end is not None else (int(hours[-1]) + 1) * HOUR_NS - 1
+        # Jam yang seluruhnya tercakup rentang: [first_full, last_full)
+        first_full = -(-start_ns // HOUR_NS)
+        last_full = (end_ns + 1) // HOUR_NS
+        if first_full >= last_full:
+            return self._edge_counts(start_ns, end_ns)
+        parts = [self.hourly[(hours >= first_full) & (hours < last_full)]]
+        if start_ns < first_full * HOUR_NS:
+            parts.append(self._edge_counts(start_ns, first_full * HOUR_NS - 1))
+        if end_ns >= last_full * HOUR_NS:
+            parts.append(self._edge_counts(last_full * HOUR_NS, end_ns))
+        combined = pd.concat(parts)
+        return combined.groupby(level=0, sort=True).sum().astype(np.int64)
+
+    def _edge_counts(self, start_ns, end_ns):
+        """Membaca baris di jam tepi yang hanya sebagian tercakup rentang."""
+        start, end = pd.Timestamp(start_ns), pd.Timestamp(end_ns)
+        return _sum_hours([_hour_counts(index.slice(start, end), self.date_col, self._counts_fn)
+                           for index in self._indexes])
+
+    def view(self, granularity="day", start=None, end=None):
+        """Tabel metrik pada resolusi ``granularity`` (hour/shift/day/week/month)."""
+        hourly = self.window(start, end).reindex(columns=self.columns, fill_value=0)
+        hours = hourly.index.to_numpy(dtype=np.int64)
+        if granularity == "hour":
+            table = hourly.copy()
+            table.index = pd.Index(pd.to_datetime(hours, unit="h").strftime(f"{DAY_FORMAT} %H:00"), name="admission_hour")
+            return table
+        if granularity == "shift":
+            day, order = _shift_labels(hours)
+            grouped = hourly.groupby([day, order], sort=True).sum()
+            days = grouped.index.get_level_values(0).to_numpy()
+            labels = np.array([name for name, _ in SHIFTS], dtype=object)[grouped.index.get_level_values(1).to_numpy()]
+            grouped.index = pd.Index(format_day_index(days).to_numpy() + " " + labels, name="admission_shift")
+            return grouped.astype(np.int64)
+        days = hours // 24
+        if granularity == "day":
+            grouped = hourly.groupby(days, sort=True).sum()
+            grouped.index = format_day_index(grouped.index)
+            return grouped.astype(np.int64)
+        if granularity == "week":
+            # 1970-01-01 adalah hari Kamis; minggu dimulai hari Senin
+            week_start = days - (days + 3) % 7
+            grouped = hourly.groupby(week_start, sort=True).sum()
+            grouped.index = pd.Index(format_day_index(grouped.index).to_numpy(), name="admission_week")
+            return grouped.astype(np.int64)
+        if granularity == "month":
+            months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+            grouped = hourly.groupby(months, sort=True).sum()
+            month_start = pd.DatetimeIndex(grouped.index.to_numpy().astype("datetime64[M]").astype("datetime64[ns]"))
+            grouped.index = pd.Index(month_start.strftime("%b-%Y"), name="admission_month")
+            return grouped.astype(np.int64)
+        raise ValueError(f"Granularitas tidak dikenal: {granularity}")
+
+
+def _hope_counts(df):
+    return pd.DataFrame({HOPE_COUNT_COL: np.ones(len(df), dtype=np.int64)}, index=df.index)
+
+
+def emr_cube(df, check=None):
+    """Kubus rollup EMR berdasarkan admission_date (di-memo per DataFrame).
+
+    ``check`` dipanggil di antara chunk saat kubus pertama kali dibangun (titik pembatalan job).
+    """
+    return frame_memo.get(df, "rollup:emr", lambda d: RollupCube(d, SUMMARY_DATE_COL, indicator_frame, check))
+
+
+def attach_emr_cube(df, cube):
+    """Kubus EMR ``df`` dari kubus hasil job (lihat ``RollupCube.detached``) tanpa membangunnya ulang.
+
+    ``cube`` harus dihitung dari data yang isinya sama dengan ``df``; bila ``df``
+    sudah punya kubus di memo, kubus tersebut yang dipakai.
+    """
+    return frame_memo.get(df, "rollup:emr", cube.rebased)
+
+
+def hope_cube(df, date_col="Reg. / Adm. Date"):
+    """Kubus rollup jumlah pasien HOPE berdasarkan tanggal registrasi (di-memo per DataFrame)."""
+    return frame_memo.get(df, f"rollup:hope:{date_col}", lambda d: RollupCube(d, date_col, _hope_counts))
+
+
+def hope_adoption_table(cube, start_date=None, end_date=None):
+    """Tabel adopsi pasien HOPE per hari (kolom Date berformat dd-Mmm)."""
+    start = pd.Timestamp(start_date).normalize() if start_date is not None else None
+    end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, "ns") if end_date is not None else None
+    daily = cube.view("day", start, end)
+    dates = pd.to_datetime(daily.index, format=DAY_FORMAT).strftime("%d-%b")
+    return pd.DataFrame({"Date": dates, HOPE_COUNT_COL: daily[HOPE_COUNT_COL].to_numpy()})
@@ -0,0 +1,216 @@
+"""Penyimpanan data per tab session EMR dengan batas memori.
+
+Setiap tab menyimpan satu DataFrame basis (data mentah sheet terpilih) yang
+tidak pernah diubah. Data bersih disimpan sebagai posisi baris pada basis;
+DataFrame-nya dibentuk saat dibutuhkan dan dapat dibuang kapan saja. Bila
+total memori seluruh tab melewati batas, tab yang paling lama tidak dipakai
+dilepas lebih dulu: data bersihnya dibuang, lalu basisnya di-spill (dilepas
+dari memori dan dibaca ulang dari cache disk workbook saat tab dibuka lagi).
+Extract baru dapat ditambahkan ke data bersih sebuah tab (mode append); sejak
+itu data bersih disimpan oleh EmrHistory dan tidak lagi dapat dibuang, dan
+tabel duplikat memakai gabungan data mentah dengan extract mentah tambahan.
+"""
+import os
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from engine.cleaning import convert_date_columns
+from engine.dtypes import concat_frames
+from engine.incremental import EmrHistory
+from engine.sizing import frame_nbytes
+
+DEFAULT_BUDGET_MB = 2048
+
+
+class TabState:
+    """Data satu tab: workbook sumber, basis data mentah, dan posisi baris data bersih."""
+
+    def __init__(self):
+        self.sheets = None
+        self.selected_sheet = None
+        self.stream = None
+        self.log = []
+        self.cleaned_rows = None
+        self.remove_no_epa = False
+        self.history = None
+        self.spilled = False
+        self._raw = None
+        self._cleaned = None
+        self._raw_all = None
+        self._sizes = {}
+
+    def set_workbook(self, sheets):
+        """Mengganti workbook sumber; data mentah dan bersih sebelumnya dilepas."""
+        self.sheets = sheets
+        self.set_raw(None, None)
+
+    def set_raw(self, sheet_name, df):
+        """Menetapkan basis data mentah; data bersih dari basis lain dibuang."""
+        if df is not self._raw or sheet_name != self.selected_sheet:
+            self.cleaned_rows = None
+            self.history = None
+            self._cleaned = None
+            self._raw_all = None
+        self.selected_sheet = sheet_name
+        self._raw = df
+        self.spilled = False
+
+    @property
+    def raw(self):
+        """Basis data mentah; dibaca ulang dari workbook bila sebelumnya di-spill."""
+        if self._raw is None and self.spilled:
+            self._raw = convert_date_columns(self.sheets[self.selected_sheet])
+            self.spilled = False
+        return self._raw
+
+    @property
+    def appended(self):
+        """Jumlah extract yang sudah ditambahkan ke data bersih (hilang bila data dibersihkan ulang)."""
+        return len(self.history.log) if self.history is not None else 0
+
+    @property
+    def raw_all(self):
+        """Data mentah beserta seluruh extract mentah yang ditambahkan (untuk tabel duplikat)."""
+        raw = self.raw
+        if raw is None or not self.appended:
+            return raw
+        segments = self.history.raw_segments
+        if self._raw_all is None or self._raw_all[0] is not raw or self._raw_all[1] != len(segments):
+            self._raw_all = (raw, len(segments), concat_frames([raw] + segments))
+        return self._raw_all[2]
+
+    def set_cleaned(self, rows, remove_no_epa=False):
+        """Menyimpan data bersih sebagai posisi baris (urutan tampil) pada basis data mentah.
+
+        DataFrame-nya dibentuk dari posisi baris saat dibutuhkan. Extract yang
+        sudah ditambahkan ikut dibuang (lihat ``appended``).
+        """
+        self.cleaned_rows = np.asarray(rows, dtype=np.int64)
+        self.remove_no_epa = remove_no_epa
+        self.history = None
+        self._cleaned = None
+        self._raw_all = None
+
+    def append(self, df):
+        """Menambahkan extract baru ke data bersih tab ini; mengembalikan ``(msg, stats)``."""
+        if self.cleaned_rows is None:
+            raise ValueError("Bersihkan data terlebih dahulu sebelum menambah extract baru.")
+        if self.history is None:
+            self.history = EmrHistory(self.raw, self.cleaned, self.remove_no_epa)
+            self._cleaned = None
+        return self.history.append(df)
+
+    @property
+    def cleaned(self):
+        """DataFrame data bersih, dibentuk dari basis dan posisi baris saat pertama dibutuhkan."""
+        if self.cleaned_rows is None:
+            return None
+        if self.history is not None:
+            return self.history.frame()
+        if self._cleaned is None:
+            self._cleaned = self.raw.take(self.cleaned_rows)
+        return self._cleaned
+
+    def frames(self):
+        """DataFrame yang sedang berada di memori untuk tab ini."""
+        frames = [df for df in (self._raw, self._cleaned) if df is not None]
+        if self._raw_all is not None:
+            frames.append(self._raw_all[2])
+        return frames + (self.history.frames() if self.history is not None else [])
+
+    def nbytes(self, frame):
+        """Perkiraan memori satu frame tab ini (di-cache; frame tidak pernah diubah)."""
+        entry = self._sizes.get(id(frame))
+        if entry is None or entry[0]() is not frame:
+            entry = self._sizes[id(frame)] = (weakref.ref(frame), frame_nbytes(frame))
+        return entry[1]
+
+    def drop_views(self):
+        """Membuang DataFrame data bersih dan gabungan data mentah; posisi baris tetap disimpan."""
+        freed = self._cleaned is not None or self._raw_all is not None
+        self._cleaned = None
+        self._raw_all = None
+        return freed
+
+    def spill(self):
+        """Melepas basis data mentah dari memori; dibaca ulang dari cache disk saat diakses."""
+        if self._raw is None or self.sheets is None:
+            return False
+        self.drop_views()
+        self._raw = None
+        self.spilled = True
+        self.sheets.release(self.selected_sheet)
+        return True
+
+
+class SessionStore:
+    """Kumpulan TabState per session dengan batas memori dan pelepasan LRU.
+
+    Batas diambil dari ``budget_mb`` atau variabel lingkungan ED_SESSION_BUDGET_MB
+    (default 2048 MB).
+    """
+
+    def __init__(self, budget_mb=None):
+        if budget_mb is None:
+            budget_mb = float(os.environ.get("ED_SESSION_BUDGET_MB", DEFAULT_BUDGET_MB))
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._tabs = OrderedDict()
+
+    def __contains__(self, tab_id):
+        return tab_id in self._tabs
+
+    def __getitem__(self, tab_id):
+        """Mengambil tab dan menandainya sebagai yang terakhir dipakai."""
+        state = self._tabs[tab_id]
+        self._tabs.move_to_end(tab_id)
+        return state
+
+    def get(self, tab_id):
+        """Mengambil tab tanpa mengubah urutan LRU (None bila tidak ada)."""
+        return self._tabs.get(tab_id)
+
+    def add(self, tab_id):
+        self._tabs[tab_id] = TabState()
+        return self._tabs[tab_id]
+
+    def remove(self, tab_id):
+        self._tabs.pop(tab_id, None)
+
+    def usage(self):
+        """Memori per tab (byte). Frame yang dipakai bersama dihitung pada tab terbaru saja."""
+        seen = set()
+        usage = {}
+        for tab_id in reversed(self._tabs):
+            state = self._tabs[tab_id]
+            total = 0
+            for frame in state.frames():
+                if id(frame) not in seen:
+                    seen.add(id(frame))
+                    total += state.nbytes(frame)
+            if state.cleaned_rows is not None:
+                total += state.cleaned_rows.nbytes
+            if state.history is not None:
+                total += state.history.key_bytes
+            usage[tab_id] = total
+        return usage
+
+    def total_bytes(self):
+        return sum(self.usage().values())
+
+    def enforce(self, active_id=None):
+        """Melepas data tab LRU (selain ``active_id``) hingga total memori di bawah batas.
+
+        Mengembalikan daftar ``(tab_id, aksi)`` dengan aksi ``"views"`` (data
+        bersih dibuang) atau ``"spill"`` (basis dilepas ke cache disk).
+        """
+        actions = []
+        candidates = [tab_id for tab_id in self._tabs if tab_id != active_id]
+        for step, action in (("drop_views", "views"), ("spill", "spill")):
+            for tab_id in candidates:
+                if self.total_bytes() <= self.budget_bytes:
+                    return actions
+                if getattr(self._tabs[tab_id], step)():
+                    actions.append((tab_id, action))
+        return actions
@@ -0,0 +1,46 @@
+"""Perkiraan ukuran memori DataFrame dan hasil turunan.
+
+Dipakai bersama oleh penyimpanan per session (engine.session_store) dan cache
+hasil bersama proses (engine.result_cache) tanpa keduanya saling mengimpor.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_ROWS = 1_000
+
+
+def frame_nbytes(df, sample=SAMPLE_ROWS):
+    """Perkiraan memori DataFrame (byte); isi kolom teks diperkirakan dari sampel baris."""
+    if df is None:
+        return 0
+    n = len(df)
+    index_bytes = int(df.index.memory_usage())
+    if n == 0:
+        return index_bytes
+    rows = df.iloc[::max(1, n // sample)]
+    per_row = rows.memory_usage(index=False, deep=True).sum() / len(rows)
+    return index_bytes + int(per_row * n)
+
+
+def result_nbytes(value):
+    """Perkiraan memori sebuah hasil (byte); grafik plotly diukur dari panjang JSON-nya."""
+    if isinstance(value, pd.DataFrame):
+        return frame_nbytes(value)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(result_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(result_nbytes(v) for v in value.values())
+    if hasattr(value, "to_json"):
+        return len(value.to_json())
+    if hasattr(value, "__dict__") and not callable(value):
+        # Objek hasil (mis. kubus rollup) diukur dari atributnya
+        return sys.getsizeof(value) + result_nbytes(vars(value))
+    return sys.getsizeof(value)
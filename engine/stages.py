@@ -0,0 +1,125 @@
+"""Tahap pengolahan dashboard EMR/HOPE yang dijalankan sebagai job latar atau dipanggil halaman.
+
+Fungsi di sini tidak bergantung pada Streamlit dan didefinisikan sekali saat
+modul diimpor, bukan di setiap rerun halaman. Fungsi job menerima objek
+``Job`` sebagai argumen pertama (lihat engine.jobs); bila ``profiler``
+diberikan, tahap di dalamnya ikut dicatat dengan nama yang sama seperti saat
+dipanggil langsung dari halaman.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.charts import trend_axis, trend_view
+from engine.cleaning import cleaning_mask, convert_date_columns
+from engine.columns import HOPE_COLUMNS
+from engine.export import EXPORT_FORMATS, emr_excel_bytes, export_bytes
+from engine.pipeline import HOPE_DATE_COL
+from engine.reconcile import reconcile_units
+from engine.rollup import emr_cube
+from engine.summary import SUMMARY_DATE_COL
+from engine.time_index import sorted_rows
+
+
+def _profiled(profiler, name, func):
+    return func if profiler is None else profiler.wrap(name, func)
+
+
+def clean_rows(df, remove_no_epa=False, check=None):
+    """Posisi baris bersih (tanpa duplikat, terurut menurut admission_date) beserta pesannya.
+
+    ``check`` dipanggil di antara langkah berat sebagai titik pembatalan job.
+    """
+    keep, msg = cleaning_mask(df, remove_no_epa, check)
+    if check is not None:
+        check()
+    return sorted_rows(df, SUMMARY_DATE_COL, np.flatnonzero(keep)), msg
+
+
+def emr_summary(df, granularity="day", start=None, end=None, check=None):
+    """Ringkasan adopsi EMR dari kubus rollup per jam; DataFrame kosong bila admission_date tidak ada.
+
+    ``check`` dipanggil di antara chunk saat kubus dibangun (titik pembatalan job).
+    """
+    if SUMMARY_DATE_COL not in df.columns:
+        return pd.DataFrame()
+    return emr_cube(df, check).view(granularity, start, end)
+
+
+def trend_table(df_cleaned, granularity, window):
+    """Tabel grafik tren, granularitas yang ditampilkan, dan nilai sumbu x-nya."""
+    table, shown = trend_view(emr_cube(df_cleaned), granularity, *window)
+    return table, shown, trend_axis(table, shown)
+
+
+def parse_sheet_job(job, sheets, sheet_name, profiler=None):
+    """Job parse satu sheet workbook EMR lalu konversi kolom tanggalnya."""
+    job.report(0.1, f"Membaca sheet '{sheet_name}'")
+    df = _profiled(profiler, "parse_sheet", sheets.load)(sheet_name, check=job.check)
+    job.check()
+    job.report(0.9, "Mengonversi kolom tanggal")
+    return _profiled(profiler, "convert_date_columns", convert_date_columns)(df)
+
+
+def clean_job(job, df, remove_no_epa, profiler=None):
+    """Job pembersihan duplikat: ``(posisi_baris, pesan)``.
+
+    Hanya posisi baris yang dikembalikan (dan di-cache); DataFrame bersih dibentuk
+    oleh tab session sendiri sehingga dapat dilepas saat memori session penuh.
+    """
+    job.report(0.1, "Mencari dan menghapus duplikat")
+    rows, msg = _profiled(profiler, "clean_duplicates", clean_rows)(df, remove_no_epa, job.check)
+    return rows, msg
+
+
+def summary_job(job, df_cleaned, profiler=None):
+    """Job kubus rollup per jam data bersih; None bila admission_date tidak ada.
+
+    Kubus dikembalikan tanpa referensi ke DataFrame (``RollupCube.detached``) agar
+    dapat di-cache bersama; halaman memasangnya dengan ``attach_emr_cube`` lalu
+    membaca tampilan per granularitas/rentang darinya tanpa memindai ulang data.
+    """
+    if SUMMARY_DATE_COL not in df_cleaned.columns:
+        return None
+    job.report(0.1, "Menghitung kubus rollup per jam")
+    return _profiled(profiler, "create_summary", emr_cube)(df_cleaned, job.check).detached()
+
+
+def download_job(job, df_cleaned, cleaned_format, profiler=None):
+    """Job file unduhan: Excel utama (dan Cleaned_Data dalam format lain bila dipilih)."""
+    job.report(0.02, "Menyiapkan summary")
+    summary = _profiled(profiler, "create_summary", emr_summary)(df_cleaned, check=job.check)
+
+    def progress(done, total):
+        job.report(0.05 + 0.9 * done / max(total, 1), f"Menulis {done}/{total} baris Excel")
+
+    excel_data = _profiled(profiler, "generate_excel_download", emr_excel_bytes)(
+        df_cleaned if cleaned_format == "xlsx" else None, summary, progress)
+    cleaned_data = None
+    if cleaned_format != "xlsx":
+        job.report(0.95, f"Menulis Cleaned_Data ({EXPORT_FORMATS[cleaned_format][0]})")
+        cleaned_data = export_bytes(df_cleaned, cleaned_format)
+    return excel_data, cleaned_data
+
+
+def hope_columns(df, columns=HOPE_COLUMNS):
+    """Menyisakan kolom penting HOPE dan mengonversi tanggal registrasi.
+
+    Tanpa salinan bila kolom sudah diproyeksikan dan tanggal sudah dikonversi saat ingest.
+    """
+    df_cleaned = df if list(df.columns) == list(columns) else df[list(columns)]
+    if not pd.api.types.is_datetime64_any_dtype(df_cleaned[HOPE_DATE_COL]):
+        df_cleaned = df_cleaned.assign(**{HOPE_DATE_COL: pd.to_datetime(df_cleaned[HOPE_DATE_COL], errors="coerce")})
+    return df_cleaned
+
+
+def remove_cancelled(df_cleaned, profiler=None):
+    """Membuang registrasi 'Cancelled' dan mengurutkan menurut tanggal registrasi dalam satu pengambilan baris."""
+    rows = np.flatnonzero((df_cleaned["Status"].str.lower() != "cancelled").to_numpy())
+    return df_cleaned.take(_profiled(profiler, "sorted_rows", sorted_rows)(df_cleaned, HOPE_DATE_COL, rows))
+
+
+def reconcile_job(job, sources):
+    """Job rekonsiliasi EMR ↔ HOPE seluruh unit; progres dilaporkan per unit yang selesai."""
+    job.report(0.0, f"Memproses {len(sources)} unit")
+    return reconcile_units(sources, progress=lambda done, total, unit: job.report(
+        done / total, f"Unit {unit} selesai ({done}/{total})"))
@@ -0,0 +1,105 @@
+"""Mode streaming untuk file CSV EMR yang lebih besar dari memori.
+
+CSV dibaca per chunk. Duplikat (admission_no, created_date) dibuang dengan
+bantuan KeySet, lalu hitungan summary per hari ditambahkan secara bertahap.
+Puncak memori dibatasi oleh ukuran chunk ditambah ukuran himpunan kunci.
+Format kolom tanggal ditentukan sekali (dari pengguna atau ditebak dari nilai
+pertama yang terisi, seperti ``pd.to_datetime`` pada seluruh kolom) lalu
+dipakai untuk setiap chunk, sehingga semua chunk di-parse dengan aturan sama.
+"""
+from io import BytesIO
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from engine.cleaning import DEDUP_KEYS, cleaning_message
+from engine.columns import EMR_COLUMNS, EMR_DATE_COLUMNS
+from engine.dtypes import PRESENCE_COLUMNS, presence
+from engine.keyset import KeySet, row_key_hashes
+from engine.summary import SUMMARY_DATE_COL, aggregate_by_day, finalize_summary
+
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _as_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _read_header(source):
+    header = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return header
+
+
+def _guess_format(values):
+    """Format tanggal dari nilai pertama yang terisi; None bila belum ada nilai atau tidak dapat ditebak."""
+    filled = values.dropna()
+    return guess_datetime_format(str(filled.iloc[0])) if len(filled) else None
+
+
+def stream_csv_summary(source, remove_no_epa=False, start_dt=None, end_dt=None,
+                       chunksize=DEFAULT_CHUNKSIZE, date_format=None):
+    """Membersihkan duplikat dan membuat summary dari CSV EMR secara streaming.
+
+    Hasilnya sama dengan ``clean_duplicates`` lalu ``filter_data_by_date`` (bila
+    ``start_dt``/``end_dt`` diisi) dan ``compute_summary`` pada data penuh.
+    ``date_format`` (format strftime untuk semua kolom tanggal, atau dict per
+    kolom) mengganti format yang ditebak dari nilai pertama tiap kolom.
+    Mengembalikan ``(summary, msg, stats)``; ``stats["date_formats"]`` berisi
+    format yang dipakai.
+    """
+    source = _as_source(source)
+    header = _read_header(source)
+    if SUMMARY_DATE_COL not in header:
+        raise ValueError(f"Kolom {SUMMARY_DATE_COL} tidak ditemukan.")
+    usecols = [c for c in EMR_COLUMNS if c in header]
+    dedupe = all(c in header for c in DEDUP_KEYS)
+    date_columns = [c for c in EMR_DATE_COLUMNS if c in usecols]
+    if isinstance(date_format, dict):
+        formats = {col: date_format.get(col) for col in date_columns}
+    else:
+        formats = dict.fromkeys(date_columns, date_format)
+    # Kolom yang formatnya masih ditebak; tebakan dikunci pada chunk pertama yang berisi nilai
+    guessing = {col for col, fmt in formats.items() if fmt is None}
+
+    seen = KeySet()
+    counts = None
+    before = removed_dup = removed_no_epa = remaining = chunks = 0
+    reader = pd.read_csv(source, usecols=usecols, chunksize=chunksize,
+                         dtype={"admission_no": str} if "admission_no" in usecols else None)
+    for chunk in reader:
+        chunks += 1
+        before += len(chunk)
+        for col in date_columns:
+            if col in guessing and chunk[col].notna().any():
+                formats[col] = _guess_format(chunk[col])
+                guessing.discard(col)
+            chunk[col] = pd.to_datetime(chunk[col], errors="coerce", format=formats[col])
+        if dedupe:
+            keep = seen.first_seen(row_key_hashes(chunk, DEDUP_KEYS))
+            removed_dup += int((~keep).sum())
+            chunk = chunk[keep]
+        # Setelah kunci di-hash, kolom identitas cukup disimpan sebagai flag "terisi"
+        chunk = chunk.assign(**{col: presence(chunk[col]) for col in PRESENCE_COLUMNS if col in chunk.columns})
+        if remove_no_epa and "admission_no" in chunk.columns:
+            has_epa = chunk["admission_no"].to_numpy()
+            removed_no_epa += int((~has_epa).sum())
+            chunk = chunk[has_epa]
+        remaining += len(chunk)
+        if start_dt is not None and end_dt is not None:
+            dates = chunk[SUMMARY_DATE_COL]
+            chunk = chunk[(dates >= start_dt) & (dates <= end_dt)]
+        part = aggregate_by_day(chunk)
+        counts = part if counts is None else counts.add(part, fill_value=0)
+
+    summary = finalize_summary(counts.sort_index().astype("int64") if counts is not None
+                               else aggregate_by_day(pd.DataFrame(columns=usecols)))
+    msg = cleaning_message(before, removed_dup, removed_no_epa, remaining)
+    stats = {"rows": before, "chunks": chunks, "unique_keys": len(seen), "keyset_bytes": seen.nbytes,
+             "date_formats": formats}
+    return summary, msg, stats
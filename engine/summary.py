@@ -0,0 +1,105 @@
+"""Mesin summary adopsi EMR yang tidak bergantung pada Streamlit.
+
+Setiap indikator diubah sekali menjadi kolom boolean, lalu seluruh metrik
+dihitung dengan satu kali grouped sum pada kunci hari integer.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.dtypes import presence
+
+SUMMARY_DATE_COL = "admission_date"
+DAY_FORMAT = "%d-%b-%Y"
+
+# (nama metrik, kolom sumber, nilai yang dihitung; None berarti "tidak kosong")
+INDICATOR_SPEC = [
+    ("Link_EPA", "admission_no", None),
+    ("NurseAssessment", "nurse_assessor", None),
+    ("InitAssessment", "assigned_doctor_name", None),
+    ("HOME", "ed_discharge_plan", "HOME"),
+    ("IPD", "ed_discharge_plan", "IPD"),
+    ("PASSAWAY", "ed_discharge_plan", "PASSAWAY"),
+    ("Reviewed_Medical_Equipment", "reviewed_medical_equipment", "Ya"),
+    ("Discharge_Approved", "status_discharge", "APPROVED"),
+]
+
+SUMMARY_COLUMNS = ["Total_Triage"] + [name for name, _, _ in INDICATOR_SPEC]
+
+# Urutan metrik yang ditawarkan pada grafik tren
+METRICS = ["Total_Triage", "Link_EPA", "Reviewed_Medical_Equipment", "NurseAssessment",
+           "InitAssessment", "HOME", "IPD", "PASSAWAY", "Discharge_Approved"]
+
+
+def day_keys(dates):
+    """Mengubah kolom datetime menjadi kunci hari integer (hari sejak epoch) beserta mask baris valid."""
+    dates = pd.to_datetime(dates, errors="coerce")
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    values = dates.to_numpy(dtype="datetime64[ns]")
+    valid = ~np.isnat(values)
+    keys = values.astype("datetime64[D]").astype(np.int64)
+    return keys, valid
+
+
+def format_day_index(keys):
+    """Mengubah kunci hari integer menjadi index tanggal berformat dd-Mmm-YYYY."""
+    index = pd.to_datetime(np.asarray(keys, dtype=np.int64), unit="D").strftime(DAY_FORMAT)
+    return pd.Index(index, name=SUMMARY_DATE_COL)
+
+
+def indicator_frame(df):
+    """Membuat tabel indikator boolean (satu kolom per metrik) dari data EMR."""
+    n = len(df)
+    data = {"Total_Triage": np.ones(n, dtype=bool)}
+    for name, col, value in INDICATOR_SPEC:
+        if col not in df.columns:
+            data[name] = np.zeros(n, dtype=bool)
+        elif value is None:
+            data[name] = presence(df[col])
+        else:
+            data[name] = (df[col] == value).to_numpy(dtype=bool, na_value=False)
+    return pd.DataFrame(data, columns=SUMMARY_COLUMNS)
+
+
+def aggregate_by_day(df, date_col=SUMMARY_DATE_COL):
+    """Menjumlahkan indikator per kunci hari integer; baris tanpa tanggal diabaikan."""
+    keys, valid = day_keys(df[date_col])
+    indicators = indicator_frame(df)[valid]
+    counts = indicators.groupby(keys[valid], sort=True).sum()
+    return counts.astype(np.int64)
+
+
+def finalize_summary(counts):
+    """Mengubah hitungan per kunci hari menjadi tabel summary yang ditampilkan."""
+    summary = counts.reindex(columns=SUMMARY_COLUMNS, fill_value=0).astype(np.int64)
+    summary.index = format_day_index(counts.index)
+    return summary
+
+
+def compute_summary(df, date_col=SUMMARY_DATE_COL):
+    """Membuat ringkasan adopsi EMR per hari berdasarkan admission_date."""
+    return finalize_summary(aggregate_by_day(df, date_col))
+
+
+def total_row(summary):
+    """Menjumlahkan seluruh kolom summary menjadi satu baris 'Total'."""
+    total_df = summary.sum(numeric_only=True).to_frame().T
+    total_df.index = ["Total"]
+    return total_df
+
+
+def percentage_per_day(summary):
+    """Menghitung persentase EPA dan review alat medis per hari."""
+    perc = pd.DataFrame(index=summary.index)
+    perc["EPA_Percentage"] = (summary["Link_EPA"] / summary["Total_Triage"] * 100).round(1)
+    perc["Review_Percentage"] = (summary["Reviewed_Medical_Equipment"] / summary["Total_Triage"] * 100).round(1)
+    return perc
+
+
+def percentage_total(summary):
+    """Menghitung persentase EPA dan review alat medis untuk seluruh periode."""
+    total = summary.sum(numeric_only=True)
+    return pd.DataFrame({
+        "EPA_Percentage": [(total["Link_EPA"] / total["Total_Triage"] * 100).round(1)],
+        "Review_Percentage": [(total["Reviewed_Medical_Equipment"] / total["Total_Triage"] * 100).round(1)]
+    }, index=["Total"])
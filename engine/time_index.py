@@ -0,0 +1,105 @@
+"""Indeks waktu terurut untuk filter rentang tanggal dengan pencarian biner.
+
+Data disimpan terurut menurut kolom waktu (NaT di akhir) sehingga filter
+rentang cukup dua kali ``searchsorted`` dan hasilnya berupa potongan baris
+berurutan, bukan mask boolean penuh.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.keyset import datetime_key
+from engine.memo import frame_memo
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _to_ns(value):
+    return pd.Timestamp(value).as_unit("ns").value
+
+
+def _time_order(values):
+    """Urutan stabil (NaT di akhir) untuk array waktu int64; None bila sudah urut."""
+    nat = values == _NAT
+    n_valid = len(values) - int(nat.sum())
+    valid_part = values[:n_valid]
+    if not nat[:n_valid].any() and (n_valid < 2 or (np.diff(valid_part) >= 0).all()):
+        return None
+    return np.argsort(np.where(nat, np.iinfo(np.int64).max, values), kind="stable")
+
+
+def sort_by_time(df, date_col):
+    """Mengurutkan DataFrame menurut kolom waktu (stabil, NaT di akhir); tanpa salinan bila sudah urut."""
+    order = _time_order(datetime_key(df[date_col]))
+    return df if order is None else df.iloc[order]
+
+
+def merge_order(df, other, date_col):
+    """Urutan baris gabungan ``[df, other]`` yang masing-masing sudah terurut menurut kolom waktu.
+
+    Setara ``sort_by_time`` pada gabungannya (pada waktu yang sama baris ``df``
+    lebih dulu), tetapi cukup satu pencarian biner per baris ``other`` tanpa
+    mengurutkan ulang ``df``.
+    """
+    left = datetime_key(df[date_col])
+    right = datetime_key(other[date_col])
+    left = np.where(left == _NAT, np.iinfo(np.int64).max, left)
+    right = np.where(right == _NAT, np.iinfo(np.int64).max, right)
+    right_pos = np.searchsorted(left, right, side="right") + np.arange(len(right))
+    order = np.empty(len(left) + len(right), dtype=np.intp)
+    is_left = np.ones(len(order), dtype=bool)
+    is_left[right_pos] = False
+    order[is_left] = np.arange(len(left))
+    order[right_pos] = len(left) + np.arange(len(right))
+    return order
+
+
+def sorted_rows(df, date_col, rows):
+    """Mengurutkan posisi baris ``rows`` pada ``df`` menurut kolom waktu (stabil, NaT di akhir)."""
+    order = _time_order(datetime_key(df[date_col])[rows])
+    return rows if order is None else rows[order]
+
+
+class TimeIndex:
+    """Data terurut menurut ``date_col`` beserta array waktu int64 untuk pencarian rentang."""
+
+    def __init__(self, df, date_col):
+        self.date_col = date_col
+        self.frame = sort_by_time(df, date_col)
+        values = datetime_key(self.frame[date_col])
+        self.n_valid = int((values != _NAT).sum())
+        self._values = values[:self.n_valid]
+
+    def __len__(self):
+        return len(self.frame)
+
+    def min(self):
+        """Waktu paling awal (None bila tidak ada tanggal valid)."""
+        return pd.Timestamp(self._values[0]) if self.n_valid else None
+
+    def max(self):
+        """Waktu paling akhir (None bila tidak ada tanggal valid)."""
+        return pd.Timestamp(self._values[-1]) if self.n_valid else None
+
+    def bounds(self, start, end):
+        """Posisi baris [lo, hi) untuk rentang waktu inklusif ``start``..``end``."""
+        lo = int(np.searchsorted(self._values, _to_ns(start), side="left"))
+        hi = int(np.searchsorted(self._values, _to_ns(end), side="right"))
+        return lo, max(lo, hi)
+
+    def slice(self, start, end):
+        """Baris dengan waktu di antara ``start`` dan ``end`` (inklusif) sebagai potongan berurutan."""
+        lo, hi = self.bounds(start, end)
+        return self.frame.iloc[lo:hi]
+
+    def slice_dates(self, start_date, end_date):
+        """Baris dari awal ``start_date`` hingga akhir ``end_date`` (per hari, inklusif)."""
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+        lo = int(np.searchsorted(self._values, _to_ns(start), side="left"))
+        hi = int(np.searchsorted(self._values, _to_ns(end), side="left"))
+        return self.frame.iloc[lo:max(lo, hi)]
+
+
+def time_index(df, date_col):
+    """Mengambil TimeIndex untuk DataFrame (di-memo selama objeknya tidak berubah)."""
+    return frame_memo.get(df, f"time_index:{date_col}", lambda d: TimeIndex(d, date_col))
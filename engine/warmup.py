@@ -0,0 +1,80 @@
+"""Pemanasan modul berat agar grafik dan file Excel pertama tidak menunggu impor.
+
+openpyxl dan plotly hanya diimpor di dalam fungsi yang membutuhkannya, sehingga
+cold start dashboard tidak membayarnya. Modul ini memuatnya lebih awal (satu
+grafik dan satu workbook kecil ikut dibuat agar validator plotly dan style
+openpyxl ikut terinisialisasi):
+
+- di thread latar saat script dashboard pertama kali dijalankan proses server,
+  bila variabel lingkungan ED_WARMUP=1;
+- atau sebagai langkah startup/build image: ``python -m engine.warmup``.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+
+WARMUP_ENV = "ED_WARMUP"
+WARMUP_MODULES = ["pandas", "pyarrow", "openpyxl", "openpyxl.styles", "openpyxl.cell", "plotly.graph_objects"]
+
+_started = False
+_lock = threading.Lock()
+
+
+def warmup_enabled():
+    """Pemanasan aktif bila variabel lingkungan ED_WARMUP=1."""
+    return os.environ.get(WARMUP_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def warm_up(modules=WARMUP_MODULES):
+    """Mengimpor modul berat lalu membuat satu grafik dan satu workbook kecil.
+
+    Mengembalikan ``{nama_tahap: detik}``; modul yang tidak terpasang dilewati.
+    """
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = time.perf_counter() - start
+
+    import pandas as pd
+
+    from engine.charts import trend_figure
+    from engine.export import frame_excel_bytes
+
+    table = pd.DataFrame({"Total_Triage": [1, 2]}, index=pd.Index(["01-Jan-2024", "02-Jan-2024"], name="admission_date"))
+    start = time.perf_counter()
+    trend_figure(table, ["Total_Triage"], "day").to_json()
+    timings["trend_figure"] = time.perf_counter() - start
+    start = time.perf_counter()
+    frame_excel_bytes(table)
+    timings["frame_excel_bytes"] = time.perf_counter() - start
+    return timings
+
+
+def start_warm_up():
+    """Menjalankan ``warm_up`` sekali per proses di thread daemon; panggilan berikutnya diabaikan."""
+    global _started
+    with _lock:
+        if _started:
+            return None
+        _started = True
+    thread = threading.Thread(target=warm_up, name="ed-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    start = time.perf_counter()
+    for name, seconds in warm_up().items():
+        print(f"{name:<30}{seconds:>10.3f} s")
+    print(f"{'total':<30}{time.perf_counter() - start:>10.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())